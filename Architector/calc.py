@@ -1,3 +1,18 @@
+import argparse
+import math
+import operator
+import re
+import sys
+from functools import lru_cache
+
+OPERATIONS = ('+', '-', '*', '/')
+OK, DIVISION_BY_ZERO, UNKNOWN_OPERATION = 0, 1, 2
+ERROR_MESSAGES = {DIVISION_BY_ZERO: 'Division by zero', UNKNOWN_OPERATION: 'Unknown operation'}
+BATCH_DTYPE = [('a', 'f8'), ('op', 'U8'), ('b', 'f8')]
+EXPRESSION_CACHE_SIZE = 256
+MAX_NESTING = 100
+TOKEN = re.compile(r'\s*(?:(\d+\.?\d*(?:[eE][+-]?\d+)?|\.\d+(?:[eE][+-]?\d+)?)|([A-Za-z_]\w*)|(\S))')
+
 def read_number(prompt):
     while True:
         s = input(prompt).strip()
@@ -27,7 +42,232 @@ def calculate(a, b, op):
         return a / b
     raise ValueError('Unknown operation')
 
-def main():
+def operation_codes(ops):
+    import numpy as np
+
+    ops = np.asarray(ops)
+    if ops.dtype.kind in 'US':
+        # Fixed-width strings: only a single character followed by padding is a valid operation.
+        char_type = np.uint32 if ops.dtype.kind == 'U' else np.uint8
+        chars = np.ascontiguousarray(ops).view(char_type).reshape(ops.shape + (-1,))
+        codes = chars[..., 0].astype(np.uint32)
+        codes[(chars[..., 1:] != 0).any(axis=-1)] = 0
+        return codes
+    return np.array([ord(op) if isinstance(op, str) and len(op) == 1 else 0 for op in ops.tolist()],
+                    dtype=np.uint32)
+
+def divide(a, b):
+    zero = b == 0
+    if zero.any() if hasattr(zero, 'any') else zero:
+        raise ValueError('Division by zero')
+    return a / b
+
+BINARY = {'+': operator.add, '-': operator.sub, '*': operator.mul, '/': divide}
+
+def tokenize(text):
+    tokens = []
+    position = 0
+    text = text.rstrip()
+    while position < len(text):
+        match = TOKEN.match(text, position)
+        number, name, symbol = match.groups()
+        if number is not None:
+            tokens.append(('number', float(number)))
+        elif name is not None:
+            tokens.append(('name', name))
+        elif symbol in '()' or symbol in OPERATIONS:
+            tokens.append(('symbol', symbol))
+        else:
+            raise ValueError('Unknown operation')
+        position = match.end()
+    tokens.append(('end', None))
+    return tokens
+
+class ExpressionParser:
+    # Recursive descent: expr := term (+|- term)*, term := unary (*|/ unary)*,
+    # unary := (+|-)* (number | name | ( expr )). Compiles to a tree of closures env -> value.
+    # Only parentheses recurse, and their depth is capped, so neither parsing nor evaluation
+    # can hit the recursion limit.
+    def __init__(self, text):
+        self.tokens = tokenize(text)
+        self.index = 0
+        self.depth = 0
+        self.variables = []
+
+    def peek(self):
+        return self.tokens[self.index]
+
+    def take(self):
+        token = self.tokens[self.index]
+        self.index += 1
+        return token
+
+    def parse(self):
+        node = self.expression()
+        kind, value = self.peek()
+        if kind != 'end':
+            raise ValueError('Unknown operation' if kind == 'symbol' else f'Unexpected token: {value}')
+        return node
+
+    def binary(self, operand, symbols):
+        first = operand()
+        rest = []
+        while self.peek()[0] == 'symbol' and self.peek()[1] in symbols:
+            function = BINARY[self.take()[1]]
+            rest.append((function, operand()))
+        if not rest:
+            return first
+        if len(rest) == 1:
+            (function, right), = rest
+            return lambda env: function(first(env), right(env))
+
+        def chain(env):
+            value = first(env)
+            for function, right in rest:
+                value = function(value, right(env))
+            return value
+        return chain
+
+    def expression(self):
+        return self.binary(self.term, '+-')
+
+    def term(self):
+        return self.binary(self.unary, '*/')
+
+    def unary(self):
+        negative = False
+        kind, value = self.take()
+        while kind == 'symbol' and value in '+-':
+            negative ^= value == '-'
+            kind, value = self.take()
+        operand = self.primary(kind, value)
+        return (lambda env: -operand(env)) if negative else operand
+
+    def primary(self, kind, value):
+        if kind == 'number':
+            return lambda env: value
+        if kind == 'name':
+            if value not in self.variables:
+                self.variables.append(value)
+            return lambda env: env[value]
+        if kind == 'symbol' and value == '(':
+            if self.depth >= MAX_NESTING:
+                raise ValueError('Too many nested parentheses')
+            self.depth += 1
+            node = self.expression()
+            self.depth -= 1
+            if self.take() != ('symbol', ')'):
+                raise ValueError('Missing closing parenthesis')
+            return node
+        if kind == 'end':
+            raise ValueError('Unexpected end of expression')
+        raise ValueError('Unknown operation')
+
+class CompiledExpression:
+    __slots__ = ('text', 'variables', 'function')
+
+    def __init__(self, text):
+        parser = ExpressionParser(text)
+        self.function = parser.parse()
+        self.text = text
+        self.variables = tuple(parser.variables)
+
+    def __call__(self, bindings=None, **kwargs):
+        env = dict(bindings or {}, **kwargs)
+        missing = [name for name in self.variables if name not in env]
+        if missing:
+            raise ValueError('Unknown variable: ' + ', '.join(missing))
+        return self.function(env)
+
+    def evaluate_many(self, rows):
+        function = self.function
+        try:
+            return [function(row) for row in rows]
+        except KeyError as e:
+            raise ValueError('Unknown variable: ' + e.args[0]) from None
+
+@lru_cache(maxsize=EXPRESSION_CACHE_SIZE)
+def compile_expression(text):
+    return CompiledExpression(text)
+
+def evaluate(text, bindings=None, **kwargs):
+    return compile_expression(text)(bindings, **kwargs)
+
+def calculate_batch(a, b, ops):
+    import numpy as np
+
+    a = np.asarray(a, dtype=np.float64)
+    b = np.asarray(b, dtype=np.float64)
+    codes = operation_codes(ops)
+    result = np.full(a.shape, np.nan)
+    errors = np.full(a.shape, UNKNOWN_OPERATION, dtype=np.int8)
+    ufuncs = {'+': np.add, '-': np.subtract, '*': np.multiply, '/': np.divide}
+    # Overflow gives inf and inf - inf gives nan per row, as in calculate(); no warnings.
+    with np.errstate(over='ignore', invalid='ignore'):
+        for op in OPERATIONS:
+            mask = codes == ord(op)
+            if op == '/':
+                zero = b == 0
+                np.copyto(errors, DIVISION_BY_ZERO, where=mask & zero)
+                mask &= ~zero
+            np.copyto(errors, OK, where=mask)
+            ufuncs[op](a, b, out=result, where=mask)
+    return result, errors
+
+def format_results(result, errors):
+    import numpy as np
+
+    text = np.empty(result.shape, dtype=object)
+    with np.errstate(invalid='ignore'):
+        integral = np.isfinite(result) & (np.abs(result - np.trunc(result)) < 1e-12)
+    small = integral & (np.abs(result) < 2**63)
+    text[small] = list(map(str, np.trunc(result[small]).astype(np.int64).tolist()))
+    text[integral & ~small] = [str(int(value)) for value in result[integral & ~small].tolist()]
+    text[~integral] = list(map(repr, result[~integral].tolist()))
+    for code, message in ERROR_MESSAGES.items():
+        text[errors == code] = 'Error: ' + message
+    return text
+
+def load_batch(path):
+    import numpy as np
+
+    if path.endswith('.npz'):
+        with np.load(path) as data:
+            return data['a'], data['b'], data['op']
+    with open(path, encoding='utf-8') as f:
+        first = f.readline().split(',')[0]
+    try:
+        float(first)
+        skip = 0
+    except ValueError:
+        skip = 1
+    rows = np.loadtxt(path, delimiter=',', dtype=BATCH_DTYPE, skiprows=skip, ndmin=1,
+                      converters={1: lambda op: op.strip()})
+    return rows['a'], rows['b'], rows['op']
+
+def save_batch(path, result, errors):
+    import numpy as np
+
+    if path.endswith('.npz'):
+        np.savez(path, result=result, error=errors)
+        return
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('result\n')
+        f.write('\n'.join(format_results(result, errors)))
+        f.write('\n')
+
+def run_batch(input_path, output_path):
+    a, b, ops = load_batch(input_path)
+    result, errors = calculate_batch(a, b, ops)
+    if output_path:
+        save_batch(output_path, result, errors)
+    else:
+        print('\n'.join(format_results(result, errors)))
+    failed = int((errors != OK).sum())
+    if failed:
+        print(f'Rows with errors: {failed} of {len(errors)}', file=sys.stderr)
+
+def interactive():
     print('Simple calculator. Enter two numbers and an operation (+, -, *, /).')
     a = read_number('First number: ')
     b = read_number('Second number: ')
@@ -37,10 +277,45 @@ def main():
     except ValueError as e:
         print('Error:', e)
         return
-    if abs(result - int(result)) < 1e-12:
+    print_result(result)
+
+def print_result(result):
+    if math.isfinite(result) and abs(result - int(result)) < 1e-12:
         print('Result:', int(result))
     else:
         print('Result:', result)
 
+def parse_binding(text):
+    name, sep, value = text.partition('=')
+    try:
+        return name.strip(), float(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f'Expected NAME=NUMBER: {text}') from None
+
+def run_expression(text, bindings):
+    try:
+        result = evaluate(text, dict(bindings))
+    except ValueError as e:
+        print('Error:', e)
+        return
+    print_result(result)
+
+def main():
+    parser = argparse.ArgumentParser(description='Simple calculator.')
+    parser.add_argument('--batch', metavar='INPUT',
+                        help='CSV file with a,op,b rows or .npz with arrays a, b, op')
+    parser.add_argument('-o', '--output', help='Where to write results (.csv or .npz); default: stdout')
+    parser.add_argument('--expr', help='Evaluate an arithmetic expression, e.g. "(a + b) / 2"')
+    parser.add_argument('--var', type=parse_binding, action='append', default=[], metavar='NAME=NUMBER',
+                        help='Variable value for --expr (repeatable)')
+    args = parser.parse_args()
+    if args.expr is not None:
+        # argparse before Python 3.12 turns the option value '--' into [].
+        run_expression(args.expr if isinstance(args.expr, str) else '--', args.var)
+    elif args.batch:
+        run_batch(args.batch, args.output)
+    else:
+        interactive()
+
 if __name__ == '__main__':
     main()
\ No newline at end of file
@@ -1,36 +1,372 @@
+import time
+
+STARTED = time.perf_counter()
+
 import argparse
+import glob
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
 from pathlib import Path
 
-import matplotlib.pyplot as plt
-import numpy as np 
+import numpy as np
 import pandas as pd
 
-def load_data(csv_path: Path) -> pd.DataFrame:
-    return pd.read_csv(csv_path)
+from quantile_sketch import DEFAULT_RELATIVE_ERROR, QuantileSketch
+from supply_ingest import (
+    SUPPLY_DTYPES,
+    compact,
+    complete_length,
+    fingerprint,
+    load_supplies,
+    read_header,
+    read_tail,
+    read_typed,
+)
+
+LOW_SUPPLY_THRESHOLD = 100
+TOP_ROWS = 3
+DEFAULT_CHUNK_SIZE = 100_000
+OUTPUT_NAMES = ("low_supply.csv",)
+STAGES = ("report", "low-supply", "plot")
+STATE_VERSION = 1
+
+
+@dataclass
+class SupplyReport:
+    mean_price: float
+    median_quantity: float
+    price_std: float
+    supplier_revenue: pd.Series
+    category_totals: pd.Series
+    top_rows: pd.DataFrame
+    low_supply: pd.DataFrame | None = None
+
+    @property
+    def top_supplier(self) -> tuple[str, float]:
+        top_supplier = self.supplier_revenue.idxmax()
+        return top_supplier, float(self.supplier_revenue.loc[top_supplier])
+
+
+def load_data(csv_path: Path, use_cache: bool = True) -> pd.DataFrame:
+    return load_supplies(csv_path, use_cache)
+
+def grouped_sum(keys: pd.Series, values: np.ndarray) -> pd.Series:
+    codes, uniques = pd.factorize(keys, sort=True)
+    present = codes >= 0
+    totals = np.bincount(codes[present], weights=values[present], minlength=len(uniques))
+    if np.issubdtype(values.dtype, np.integer):
+        totals = totals.astype(np.int64)
+    return pd.Series(totals, index=uniques)
+
+
+def aggregate(df: pd.DataFrame, top_n: int = TOP_ROWS, low_supply: bool = True) -> SupplyReport:
+    quantity = df["quantity"].to_numpy()
+    price = df["price_per_unit"].to_numpy(dtype=float)
+    total_price = quantity * price
+
+    top_index = pd.Series(total_price).nlargest(top_n).index.to_numpy()
+    low_mask = quantity < LOW_SUPPLY_THRESHOLD
+    return SupplyReport(
+        mean_price=float(np.nanmean(price)),
+        median_quantity=float(np.median(quantity)),
+        price_std=float(np.nanstd(price)),
+        supplier_revenue=grouped_sum(df["supplier"], total_price),
+        category_totals=grouped_sum(df["category"], quantity),
+        top_rows=df.iloc[top_index].assign(total_price=total_price[top_index]),
+        low_supply=df[low_mask].assign(total_price=total_price[low_mask]) if low_supply else None,
+    )
+
+
+def merge_totals(left: dict, right: dict) -> dict:
+    merged = dict(left)
+    for key, value in right.items():
+        merged[key] = merged.get(key, 0) + value
+    return merged
+
+
+@dataclass
+class SupplyAggregate:
+    relative_error: float = DEFAULT_RELATIVE_ERROR
+    top_n: int = TOP_ROWS
+    rows: int = 0
+    price_count: int = 0
+    price_mean: float = 0.0
+    price_m2: float = 0.0
+    supplier_revenue: dict = field(default_factory=dict)
+    category_totals: dict = field(default_factory=dict)
+    top_rows: pd.DataFrame | None = None
+    quantity_sketch: QuantileSketch | None = None
+
+    def __post_init__(self) -> None:
+        if self.quantity_sketch is None:
+            self.quantity_sketch = QuantileSketch(self.relative_error)
+
+    def merge_price(self, count: int, mean: float, m2: float) -> None:
+        total = self.price_count + count
+        if not count:
+            return
+        delta = mean - self.price_mean
+        self.price_mean += delta * count / total
+        self.price_m2 += m2 + delta * delta * self.price_count * count / total
+        self.price_count = total
+
+    def merge_top(self, rows: pd.DataFrame) -> None:
+        if self.top_rows is not None:
+            rows = pd.concat([self.top_rows, rows])
+        self.top_rows = rows.nlargest(self.top_n, "total_price")
+
+    def update(self, chunk: pd.DataFrame, low_supply: bool = True) -> pd.DataFrame | None:
+        quantity = chunk["quantity"].to_numpy()
+        price = chunk["price_per_unit"].to_numpy(dtype=float)
+        total_price = quantity * price
+
+        known = price[~np.isnan(price)]
+        if len(known):
+            mean = float(known.mean())
+            self.merge_price(len(known), mean, float(((known - mean) ** 2).sum()))
+        self.rows += len(chunk)
+        self.quantity_sketch.update(quantity)
+        self.supplier_revenue = merge_totals(
+            self.supplier_revenue, grouped_sum(chunk["supplier"], total_price).to_dict()
+        )
+        self.category_totals = merge_totals(
+            self.category_totals, grouped_sum(chunk["category"], quantity).to_dict()
+        )
+
+        top_index = pd.Series(total_price).nlargest(self.top_n).index.to_numpy()
+        self.merge_top(chunk.iloc[top_index].assign(total_price=total_price[top_index]))
+        if not low_supply:
+            return None
+        low_mask = quantity < LOW_SUPPLY_THRESHOLD
+        return chunk[low_mask].assign(total_price=total_price[low_mask])
+
+    def merge(self, other: "SupplyAggregate") -> None:
+        self.rows += other.rows
+        self.merge_price(other.price_count, other.price_mean, other.price_m2)
+        self.quantity_sketch.merge(other.quantity_sketch)
+        self.supplier_revenue = merge_totals(self.supplier_revenue, other.supplier_revenue)
+        self.category_totals = merge_totals(self.category_totals, other.category_totals)
+        if other.top_rows is not None:
+            self.merge_top(other.top_rows)
+
+    def to_dict(self) -> dict:
+        return {
+            "relative_error": self.relative_error,
+            "top_n": self.top_n,
+            "rows": self.rows,
+            "price_count": self.price_count,
+            "price_mean": self.price_mean,
+            "price_m2": self.price_m2,
+            "supplier_revenue": self.supplier_revenue,
+            "category_totals": self.category_totals,
+            "top_rows": None if self.top_rows is None else self.top_rows.to_csv(),
+            "quantity_sketch": self.quantity_sketch.to_dict(),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "SupplyAggregate":
+        top_rows = data["top_rows"]
+        if top_rows is not None:
+            top_rows = compact(pd.read_csv(io.StringIO(top_rows), index_col=0, dtype=SUPPLY_DTYPES))
+        return cls(
+            relative_error=data["relative_error"],
+            top_n=data["top_n"],
+            rows=data["rows"],
+            price_count=data["price_count"],
+            price_mean=data["price_mean"],
+            price_m2=data["price_m2"],
+            supplier_revenue=data["supplier_revenue"],
+            category_totals=data["category_totals"],
+            top_rows=top_rows,
+            quantity_sketch=QuantileSketch.from_dict(data["quantity_sketch"]),
+        )
+
+    def report(self) -> SupplyReport:
+        return SupplyReport(
+            mean_price=self.price_mean if self.price_count else float("nan"),
+            median_quantity=self.quantity_sketch.quantile(0.5),
+            price_std=(self.price_m2 / self.price_count) ** 0.5 if self.price_count else float("nan"),
+            supplier_revenue=pd.Series(self.supplier_revenue).sort_index(),
+            category_totals=pd.Series(self.category_totals).sort_index(),
+            top_rows=self.top_rows,
+        )
+
+
+def aggregate_file(
+    csv_path: Path,
+    low_supply_path: Path | None,
+    chunk_size: int | None = DEFAULT_CHUNK_SIZE,
+    relative_error: float = DEFAULT_RELATIVE_ERROR,
+    use_cache: bool = True,
+) -> SupplyAggregate:
+    state = SupplyAggregate(relative_error)
+    wanted = low_supply_path is not None
+    if not chunk_size:
+        low_supply = state.update(load_data(csv_path, use_cache), wanted)
+        if low_supply_path is not None:
+            low_supply.to_csv(low_supply_path, index=False)
+        return state
+    header = True
+    with read_typed(csv_path, chunksize=chunk_size) as reader:
+        for chunk in reader:
+            low_supply = state.update(compact(chunk), wanted)
+            if low_supply_path is not None:
+                low_supply.to_csv(low_supply_path, mode="w" if header else "a", header=header, index=False)
+            header = False
+    if header:
+        low_supply = state.update(compact(read_typed(csv_path, nrows=0)), wanted)
+        if low_supply_path is not None:
+            low_supply.to_csv(low_supply_path, index=False)
+    return state
+
+
+def aggregate_chunks(
+    csv_path: Path,
+    low_supply_path: Path | None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    relative_error: float = DEFAULT_RELATIVE_ERROR,
+) -> SupplyReport:
+    return aggregate_file(csv_path, low_supply_path, chunk_size, relative_error).report()
+
 
-def cbs(df: pd.DataFrame) -> tuple[float, float, float]:
-    mean_price = float(np.mean(df["price_per_unit"]))
-    median_quantity = float(np.median(df["quantity"]))
-    price_std = float(np.std(df["price_per_unit"]))
-    return mean_price, median_quantity, price_std
+def analyze_part(task: tuple) -> tuple[Path, SupplyAggregate, float]:
+    csv_path, low_supply_path, chunk_size, relative_error, use_cache = task
+    started = time.perf_counter()
+    state = aggregate_file(csv_path, low_supply_path, chunk_size, relative_error, use_cache)
+    return csv_path, state, time.perf_counter() - started
 
-def e_totoal(df: pd.DataFrame) -> pd.DataFrame:
-    df = df.copy()
-    df["total_price"] = df["quantity"] * df["price_per_unit"]
-    return df
 
-def find_top_supplier(df: pd.DataFrame) -> tuple[str, float]:
-    supplier_revenue = df.groupby("supplier")["total_price"].sum()
-    top_supplier = supplier_revenue.idxmax()
-    return top_supplier, float(supplier_revenue.loc[top_supplier])
+def expand_inputs(patterns: list[str]) -> list[Path]:
+    paths = []
+    for pattern in patterns:
+        path = Path(pattern)
+        if path.is_dir():
+            matches = sorted(path.glob("*.csv"))
+        elif glob.has_magic(pattern):
+            matches = sorted(Path(p) for p in glob.glob(pattern, recursive=True))
+        else:
+            paths.append(path)
+            continue
+        matches = [p for p in matches if p.name not in OUTPUT_NAMES]
+        paths.extend(p for p in matches if p not in paths)
+    return paths
 
-def category_quantities(df: pd.DataFrame) -> pd.Series:
-    return df.groupby("category")["quantity"].sum()
 
-def save_low_supply(df: pd.DataFrame, output_path: Path) -> pd.DataFrame:
-    low_supply = df[df["quantity"] < 100]
-    low_supply.to_csv(output_path, index=False)
-    return low_supply
+def concat_csv(parts: list[Path], output_path: Path) -> None:
+    with open(output_path, "wb") as output:
+        for index, part in enumerate(parts):
+            with open(part, "rb") as f:
+                header = f.readline()
+                if index == 0:
+                    output.write(header)
+                shutil.copyfileobj(f, output)
+
+
+def aggregate_files(
+    csv_paths: list[Path],
+    low_supply_path: Path | None,
+    chunk_size: int | None,
+    relative_error: float,
+    use_cache: bool,
+    workers: int | None,
+) -> SupplyReport:
+    # Частини low_supply.csv пишуться поруч із результатом: тека вхідних файлів може бути лише для читання.
+    parts_parent = None if low_supply_path is None else low_supply_path.parent
+    with tempfile.TemporaryDirectory(dir=parts_parent) as parts_dir:
+        if low_supply_path is None:
+            parts = [None] * len(csv_paths)
+        else:
+            parts = [Path(parts_dir) / f"{index}.csv" for index in range(len(csv_paths))]
+        tasks = [
+            (csv_path, part, chunk_size, relative_error, use_cache)
+            for csv_path, part in zip(csv_paths, parts)
+        ]
+        started = time.perf_counter()
+        total = SupplyAggregate(relative_error)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for csv_path, state, elapsed in pool.map(analyze_part, tasks):
+                print(f"{csv_path}: {state.rows} рядків, {elapsed:.2f} с")
+                total.merge(state)
+        if low_supply_path is not None:
+            concat_csv(parts, low_supply_path)
+    print(f"Разом: {len(csv_paths)} файлів, {total.rows} рядків за {time.perf_counter() - started:.2f} с")
+    return total.report()
+
+
+def state_path_for(csv_path: Path) -> Path:
+    return csv_path.with_name(f".{csv_path.name}.state.json")
+
+
+def load_state(state_path: Path, f, low_supply_path: Path, relative_error: float) -> dict | None:
+    try:
+        saved = json.loads(state_path.read_text(encoding="utf-8"))
+        stat = os.fstat(f.fileno())
+        if (
+            saved.get("version") != STATE_VERSION
+            or saved["identity"] != [stat.st_dev, stat.st_ino]
+            or saved["aggregate"]["relative_error"] != relative_error
+            or saved["offset"] > stat.st_size
+            or saved["fingerprint"] != fingerprint(f, saved["offset"])
+            or saved["low_supply_size"] != os.path.getsize(low_supply_path)
+        ):
+            return None
+    except (OSError, ValueError, KeyError):
+        return None
+    return saved
+
+
+def save_state(state_path: Path, saved: dict) -> None:
+    temp_path = state_path.with_name(state_path.name + ".tmp")
+    temp_path.write_text(json.dumps(saved, default=lambda value: value.item()), encoding="utf-8")
+    os.replace(temp_path, state_path)
+
+
+def aggregate_incremental(
+    csv_path: Path,
+    low_supply_path: Path,
+    chunk_size: int | None = DEFAULT_CHUNK_SIZE,
+    relative_error: float = DEFAULT_RELATIVE_ERROR,
+) -> SupplyAggregate:
+    state_path = state_path_for(csv_path)
+    with open(csv_path, "rb") as f:
+        end = complete_length(f)
+        saved = load_state(state_path, f, low_supply_path, relative_error)
+        if saved is None:
+            columns, offset = read_header(f)
+            state = SupplyAggregate(relative_error)
+            pd.DataFrame(columns=columns + ["total_price"]).to_csv(low_supply_path, index=False)
+        else:
+            offset = saved["offset"]
+            columns = saved["columns"]
+            state = SupplyAggregate.from_dict(saved["aggregate"])
+
+        if end > offset:
+            # Читач сам продовжує індекс між частинами, тож додаємо лише рядки попередніх запусків.
+            base = state.rows
+            with read_tail(f, offset, end, columns, chunk_size or DEFAULT_CHUNK_SIZE) as reader:
+                for chunk in reader:
+                    chunk.index += base
+                    low_supply = state.update(compact(chunk))
+                    low_supply.to_csv(low_supply_path, mode="a", header=False, index=False)
+            offset = end
+
+        stat = os.fstat(f.fileno())
+        save_state(state_path, {
+            "version": STATE_VERSION,
+            "identity": [stat.st_dev, stat.st_ino],
+            "offset": offset,
+            "fingerprint": fingerprint(f, offset),
+            "columns": columns,
+            "low_supply_size": os.path.getsize(low_supply_path),
+            "aggregate": state.to_dict(),
+        })
+    return state
 
 
 def save_report(
@@ -54,6 +390,11 @@ def save_report(
     report_path.write_text("\n".join(report_lines))
 
 def plot_category_distribution(category_totals: pd.Series, output_path: Path) -> None:
+    import matplotlib
+
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
     plt.figure(figsize=(8, 5))
     category_totals.sort_values(ascending=False).plot(kind="bar", color="steelblue")
     plt.title("Quantity Distribution by Category")
@@ -63,42 +404,119 @@ def plot_category_distribution(category_totals: pd.Series, output_path: Path) ->
     plt.savefig(output_path)
     plt.close()
 
+class StageTimer:
+    def __init__(self, started: float) -> None:
+        self.last = started
+        self.stages: list[tuple[str, float]] = []
+
+    def mark(self, name: str) -> None:
+        now = time.perf_counter()
+        self.stages.append((name, now - self.last))
+        self.last = now
+
+    def print(self) -> None:
+        total = sum(elapsed for _, elapsed in self.stages)
+        for name, elapsed in self.stages:
+            print(f"  {name:<12} {elapsed:8.3f} с {elapsed / max(total, 1e-9):6.1%}", file=sys.stderr)
+        print(f"  {'разом':<12} {total:8.3f} с", file=sys.stderr)
+
+
+def parse_stages(text: str) -> set[str]:
+    stages = {stage.strip() for stage in text.split(",") if stage.strip()}
+    unknown = stages - set(STAGES)
+    if unknown:
+        raise argparse.ArgumentTypeError(f"Невідомі етапи: {', '.join(sorted(unknown))}")
+    return stages
+
+
 def main() -> None:
+    timer = StageTimer(STARTED)
+    timer.mark("імпорт")
     parser = argparse.ArgumentParser(description="Analyze supply data.")
     parser.add_argument(
         "csv",
-        nargs="?",
-        default="supplies.csv",
-        help="Шлях до CSV-файлу з інформацією про витратні матеріали (default: supplies.csv)",
+        nargs="*",
+        default=["supplies.csv"],
+        help="CSV-файли, теки або шаблони (glob) з інформацією про витратні матеріали (default: supplies.csv)",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=None,
+        help="Читати файл частинами по стільки рядків з обмеженою пам'яттю (default: увесь файл одразу)",
+    )
+    parser.add_argument(
+        "--median-error",
+        type=float,
+        default=DEFAULT_RELATIVE_ERROR,
+        help="Допустима відносна похибка медіани в потоковому режимі (default: 0.01)",
     )
+    parser.add_argument("--no-cache", action="store_true", help="Не використовувати бінарний кеш колонок")
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Зберігати стан поруч із файлом і наступного разу обробляти лише дописані рядки",
+    )
+    parser.add_argument("--workers", type=int, default=None, help="Кількість процесів для кількох файлів (default: усі ядра)")
+    parser.add_argument("--output-dir", default=None, help="Тека для звіту, low_supply.csv і графіка (default: тека першого файлу)")
+    parser.add_argument(
+        "--only",
+        type=parse_stages,
+        default=set(STAGES),
+        help="Які результати створювати, через кому: report,low-supply,plot (default: усі)",
+    )
+    parser.add_argument("--no-plot", action="store_true", help="Не будувати category_distribution.png")
+    parser.add_argument("--timings", action="store_true", help="Показати час запуску та кожного етапу")
     args = parser.parse_args()
+    stages = args.only - {"plot"} if args.no_plot else args.only
 
-    csv_path = Path(args.csv)
-    df = load_data(csv_path)
-    mean_price, median_quantity, price_std = cbs(df)
-
-    enriched_df = e_totoal(df)
-    top_supplier, _ = find_top_supplier(enriched_df)
-    category_totals = category_quantities(enriched_df)
-
+    csv_paths = expand_inputs(args.csv)
+    if not csv_paths:
+        sys.exit("Не знайдено жодного CSV-файлу")
+    csv_path = Path(args.output_dir) / csv_paths[0].name if args.output_dir else csv_paths[0]
     low_supply_path = csv_path.with_name("low_supply.csv")
-    save_low_supply(enriched_df, low_supply_path)
-
-    report_path = csv_path.with_name("report.txt")
-    save_report(
-        report_path,
-        mean_price,
-        median_quantity,
-        price_std,
-        top_supplier,
-        low_supply_path.name,
-    )
+    # Інкрементальний режим завжди дописує low_supply.csv: його розмір входить у збережений стан.
+    wanted_low_supply = low_supply_path if "low-supply" in stages or args.incremental else None
+    if args.incremental and len(csv_paths) > 1:
+        parser.error("--incremental працює лише з одним файлом")
+    timer.mark("аргументи")
+    if args.incremental:
+        report = aggregate_incremental(csv_paths[0], low_supply_path, args.chunk_size, args.median_error).report()
+    elif len(csv_paths) > 1:
+        report = aggregate_files(
+            csv_paths, wanted_low_supply, args.chunk_size, args.median_error, not args.no_cache, args.workers
+        )
+    elif args.chunk_size:
+        report = aggregate_chunks(csv_paths[0], wanted_low_supply, args.chunk_size, args.median_error)
+    else:
+        df = load_data(csv_paths[0], not args.no_cache)
+        timer.mark("читання")
+        report = aggregate(df, low_supply=wanted_low_supply is not None)
+        if wanted_low_supply is not None:
+            report.low_supply.to_csv(wanted_low_supply, index=False)
+    timer.mark("агрегація")
+
+    if "report" in stages:
+        top_supplier, _ = report.top_supplier
+        report_path = csv_path.with_name("report.txt")
+        save_report(
+            report_path,
+            report.mean_price,
+            report.median_quantity,
+            report.price_std,
+            top_supplier,
+            low_supply_path.name,
+        )
+        timer.mark("звіт")
 
-    plot_path = csv_path.with_name("category_distribution.png")
-    plot_category_distribution(category_totals, plot_path)
+    if "plot" in stages:
+        plot_path = csv_path.with_name("category_distribution.png")
+        plot_category_distribution(report.category_totals, plot_path)
+        timer.mark("графік")
 
-    sorted_df = enriched_df.sort_values("total_price", ascending=False)
-    print(sorted_df.head(3))
+    print(report.top_rows)
+    if args.timings:
+        timer.print()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
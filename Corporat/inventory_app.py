@@ -1,20 +1,28 @@
-import csv
 import os
+import queue
+import sqlite3
 import sys
+import threading
 import tkinter as tk
+from array import array
 from datetime import datetime
 from tkinter import filedialog, messagebox, ttk
 
-DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
-COLUMNS = (
-    "id",
-    "name",
-    "category",
-    "quantity",
-    "price",
-    "location",
-    "created_at",
-)
+from inventory_csv import COLUMNS, DATE_FORMAT, CsvLoader, validate_fields, write_csv_atomic
+from inventory_journal import JOURNAL_COMPACT_OPS, Journal
+from item_table import ItemTable
+from search_index import SearchIndex
+from sort_orders import SortOrders
+from sqlite_store import SqliteStore
+
+ROW_OVERSCAN = 5
+HEADER_HEIGHT = 24
+WHEEL_STEP = 3
+SEARCH_DEBOUNCE_MS = 200
+FILTER_POLL_MS = 25
+LOAD_POLL_MS = 30
+BATCHES_PER_TICK = 2
+COMPACTION_POLL_MS = 100
 
 class InventoryApp(tk.Tk):
     def __init__(self):
@@ -22,10 +30,35 @@ class InventoryApp(tk.Tk):
         self.title("Облік товарів")
         self.geometry("980x520")
         self.minsize(900, 480)
-        self.items = []
-        self.filtered_items = []
+        self.items = ItemTable()
+        self.filtered_slots = array("l")
+        self.search_index = SearchIndex(self.items)
         self.current_file = None
         self.sort_state = {}
+        self.sort_orders = SortOrders(self.items)
+        self.active_sort = None
+        self.selected_id = None
+        self.view_offset = 0
+        self.visible_rows = 20
+        self.row_pool = []
+        self.filter_job = None
+        self.filter_poll_job = None
+        self.query_generation = 0
+        self.pending_query = None
+        self.filter_results = queue.Queue()
+        self.loader = None
+        self.load_started = False
+        self.load_poll_job = None
+        self.load_results = queue.Queue()
+        self.imported_count = 0
+        self.journal = None
+        self.pending_changes = []
+        self.compactor = None
+        self.compaction_error = None
+        self.save_requested = False
+        self.db = None
+        self.db_query = ""
+        self.db_count = 0
         self.create_styles()
         self.create_menu()
         self.create_widgets()
@@ -42,6 +75,10 @@ class InventoryApp(tk.Tk):
         file_menu.add_command(label="Відкрити…", command=self.load_csv)
         file_menu.add_command(label="Зберегти", command=self.save_csv)
         file_menu.add_command(label="Зберегти як…", command=lambda: self.save_csv(save_as=True))
+        file_menu.add_command(label="Скасувати завантаження", command=self.cancel_load)
+        file_menu.add_separator()
+        file_menu.add_command(label="Відкрити базу SQLite…", command=self.open_database)
+        file_menu.add_command(label="Закрити базу", command=self.close_database)
         file_menu.add_separator()
         file_menu.add_command(label="Вихід", command=self.quit)
         menubar.add_cascade(label="Файл", menu=file_menu)
@@ -57,7 +94,7 @@ class InventoryApp(tk.Tk):
         self.search_var = tk.StringVar()
         search_entry = ttk.Entry(search_frame, textvariable=self.search_var)
         search_entry.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=8)
-        search_entry.bind("<KeyRelease>", lambda _e: self.apply_filter())
+        search_entry.bind("<KeyRelease>", lambda _e: self.schedule_filter())
 
         content_frame = ttk.Frame(main_frame)
         content_frame.pack(fill=tk.BOTH, expand=True)
@@ -80,9 +117,8 @@ class InventoryApp(tk.Tk):
         self.tree.column("quantity", width=90, anchor=tk.E)
         self.tree.pack(fill=tk.BOTH, expand=True, side=tk.LEFT)
 
-        scrollbar = ttk.Scrollbar(table_frame, orient=tk.VERTICAL, command=self.tree.yview)
-        self.tree.configure(yscrollcommand=scrollbar.set)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.scrollbar = ttk.Scrollbar(table_frame, orient=tk.VERTICAL, command=self.on_scrollbar)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
 
         form_frame = ttk.LabelFrame(content_frame, text="Дані товару", padding=10)
         form_frame.pack(side=tk.RIGHT, fill=tk.Y, padx=(10, 0))
@@ -114,30 +150,238 @@ class InventoryApp(tk.Tk):
         self.status_var = tk.StringVar(value="Готово")
         status_bar = ttk.Label(self, textvariable=self.status_var, anchor=tk.W, padding=(10, 4))
         status_bar.pack(fill=tk.X, side=tk.BOTTOM)
+        self.progress = ttk.Progressbar(self, mode="determinate", maximum=1.0)
 
     def bind_events(self):
         self.tree.bind("<<TreeviewSelect>>", self.on_tree_select)
+        self.tree.bind("<Configure>", self.on_tree_resize)
+        self.tree.bind("<MouseWheel>", self.on_mouse_wheel)
+        self.tree.bind("<Button-4>", lambda _e: self.scroll_rows(-WHEEL_STEP))
+        self.tree.bind("<Button-5>", lambda _e: self.scroll_rows(WHEEL_STEP))
+        self.tree.bind("<Prior>", lambda _e: self.scroll_rows(-self.visible_rows))
+        self.tree.bind("<Next>", lambda _e: self.scroll_rows(self.visible_rows))
+        self.tree.bind("<Up>", lambda _e: self.move_selection(-1))
+        self.tree.bind("<Down>", lambda _e: self.move_selection(1))
         self.bind("<Control-s>", lambda _e: self.save_csv())
         self.bind("<Control-o>", lambda _e: self.load_csv())
-
-    def apply_filter(self):
-        query = self.search_var.get().lower().strip()
-        if not query:
-            self.filtered_items = list(self.items)
+        self.bind("<Escape>", lambda _e: self.cancel_load())
+
+    def current_query(self):
+        return self.search_var.get().lower().strip()
+
+    def filter_items(self, query, is_cancelled=None):
+        if self.db is not None:
+            return self.db.count_in_thread(query)
+        result = self.items.slots() if not query else self.search_index.search(query, is_cancelled)
+        if result is None or self.active_sort is None:
+            return result
+        return self.sort_orders.sorted_view(result, *self.active_sort)
+
+    def show_filter_result(self, query, result):
+        if self.db is not None:
+            self.db_query = query
+            self.db_count = result
         else:
-            self.filtered_items = [
-                item
-                for item in self.items
-                if query in item["name"].lower() or query in item["category"].lower()
-            ]
+            self.filtered_slots = result
         self.refresh_tree()
-        self.update_status(f"Знайдено записів: {len(self.filtered_items)}")
+        self.update_status(f"Знайдено записів: {self.view_length()}")
+
+    def schedule_filter(self):
+        if self.filter_job is not None:
+            self.after_cancel(self.filter_job)
+        self.query_generation += 1
+        self.filter_job = self.after(SEARCH_DEBOUNCE_MS, self.start_filter)
+
+    def start_filter(self):
+        self.filter_job = None
+        self.query_generation += 1
+        self.pending_query = self.current_query()
+        worker = threading.Thread(
+            target=self.run_filter,
+            args=(self.query_generation, self.pending_query),
+            daemon=True,
+        )
+        worker.start()
+        if self.filter_poll_job is None:
+            self.filter_poll_job = self.after(FILTER_POLL_MS, self.poll_filter)
+
+    def restart_pending_filter(self):
+        if self.pending_query is not None:
+            self.start_filter()
+
+    def run_filter(self, generation, query):
+        is_cancelled = lambda: generation != self.query_generation
+        try:
+            result = self.filter_items(query, is_cancelled)
+        except (RuntimeError, KeyError, IndexError):
+            # Індекс чи таблиця змінилися під час пошуку; запит буде перезапущено з головного потоку.
+            return
+        except sqlite3.Error as exc:
+            # Помилка бази не минає від перезапуску: повідомляємо її, щоб poll_filter зупинився.
+            self.filter_results.put((generation, query, exc))
+            return
+        if result is not None and not is_cancelled():
+            self.filter_results.put((generation, query, result))
+
+    def poll_filter(self):
+        self.filter_poll_job = None
+        latest = None
+        while True:
+            try:
+                latest = self.filter_results.get_nowait()
+            except queue.Empty:
+                break
+        if latest is not None and latest[0] == self.query_generation:
+            self.pending_query = None
+            if isinstance(latest[2], sqlite3.Error):
+                self.update_status(f"Помилка пошуку в базі: {latest[2]}")
+            else:
+                self.show_filter_result(latest[1], latest[2])
+        elif self.pending_query is not None:
+            self.filter_poll_job = self.after(FILTER_POLL_MS, self.poll_filter)
 
     def refresh_tree(self):
-        self.tree.delete(*self.tree.get_children())
-        for item in self.filtered_items:
-            values = (item["id"], item["name"], item["category"], item["quantity"], f"{item['price']:.2f}", item["location"], item["created_at"])
-            self.tree.insert("", tk.END, values=values)
+        self.view_offset = 0
+        self.selected_id = None
+        self.render_window()
+
+    def window_size(self):
+        return self.visible_rows + ROW_OVERSCAN
+
+    def in_window(self, position):
+        return self.view_offset <= position < self.view_offset + self.window_size()
+
+    def clamp_offset(self, offset):
+        max_offset = max(0, self.view_length() - self.visible_rows)
+        return min(max(offset, 0), max_offset)
+
+    def view_length(self):
+        if self.db is not None:
+            return self.db_count
+        return len(self.filtered_slots)
+
+    def window_rows(self):
+        if self.db is not None:
+            return self.db.page(self.db_query, self.active_sort, self.view_offset, self.window_size())
+        window = self.filtered_slots[self.view_offset:self.view_offset + self.window_size()]
+        return [self.items.row_values(slot) for slot in window]
+
+    def render_window(self):
+        self.view_offset = self.clamp_offset(self.view_offset)
+        rows = self.window_rows()
+        while len(self.row_pool) < len(rows):
+            self.row_pool.append(self.tree.insert("", tk.END))
+        selected_row = None
+        for position, row_id in enumerate(self.row_pool):
+            if position >= len(rows):
+                self.tree.detach(row_id)
+                continue
+            values = rows[position]
+            self.tree.item(row_id, values=values)
+            self.tree.move(row_id, "", position)
+            if values[0] == self.selected_id:
+                selected_row = row_id
+        if selected_row is not None:
+            self.tree.selection_set(selected_row)
+        elif self.tree.selection():
+            self.tree.selection_remove(*self.tree.selection())
+        self.tree.yview_moveto(0)
+        self.update_scrollbar()
+
+    def render_row(self, position):
+        row_id = self.row_pool[position - self.view_offset]
+        self.tree.item(row_id, values=self.items.row_values(self.filtered_slots[position]))
+
+    def update_scrollbar(self):
+        total = self.view_length()
+        if total <= self.visible_rows:
+            self.scrollbar.set(0.0, 1.0)
+        else:
+            self.scrollbar.set(self.view_offset / total, (self.view_offset + self.visible_rows) / total)
+
+    def scroll_rows(self, step):
+        offset = self.clamp_offset(self.view_offset + step)
+        if offset != self.view_offset:
+            self.view_offset = offset
+            self.render_window()
+        return "break"
+
+    def move_selection(self, step):
+        # У пулі лише видимі рядки, тож на краю вікна стрілки прокручують його самі.
+        selection = self.tree.selection()
+        if not selection:
+            return None
+        target = self.view_offset + self.tree.index(selection[0]) + step
+        if not 0 <= target < self.view_length():
+            return "break"
+        if target < self.view_offset:
+            self.scroll_rows(target - self.view_offset)
+        elif target >= self.view_offset + self.visible_rows:
+            self.scroll_rows(target - self.view_offset - self.visible_rows + 1)
+        row_id = self.row_pool[target - self.view_offset]
+        self.tree.selection_set(row_id)
+        self.tree.focus(row_id)
+        return "break"
+
+    def on_scrollbar(self, action, value, unit=None):
+        if action == tk.MOVETO:
+            offset = int(float(value) * self.view_length())
+            self.scroll_rows(offset - self.view_offset)
+        elif action == tk.SCROLL:
+            step = int(value) * (self.visible_rows if unit == tk.PAGES else 1)
+            self.scroll_rows(step)
+
+    def on_mouse_wheel(self, event):
+        return self.scroll_rows(-WHEEL_STEP if event.delta > 0 else WHEEL_STEP)
+
+    def on_tree_resize(self, event):
+        row_height = int(ttk.Style(self).lookup("Treeview", "rowheight") or 20)
+        rows = max(1, (event.height - HEADER_HEIGHT) // row_height)
+        if rows != self.visible_rows:
+            self.visible_rows = rows
+            self.render_window()
+
+    def place_in_view(self, slot):
+        if self.active_sort is None:
+            self.filtered_slots.append(slot)
+            return len(self.filtered_slots) - 1
+        position = self.sort_orders.view_position(self.filtered_slots, slot, *self.active_sort)
+        self.filtered_slots.insert(position, slot)
+        return position
+
+    def insert_row(self, slot):
+        if not self.search_index.matches(slot, self.current_query()):
+            return
+        position = self.place_in_view(slot)
+        if position < self.view_offset + self.window_size():
+            self.render_window()
+        else:
+            self.update_scrollbar()
+
+    def replace_row(self, slot):
+        try:
+            position = self.filtered_slots.index(slot)
+        except ValueError:
+            self.insert_row(slot)
+            return
+        if not self.search_index.matches(slot, self.current_query()):
+            self.remove_row(slot)
+        elif self.active_sort is not None:
+            self.remove_row(slot)
+            self.insert_row(slot)
+        elif self.in_window(position):
+            self.render_row(position)
+
+    def remove_row(self, slot):
+        try:
+            position = self.filtered_slots.index(slot)
+        except ValueError:
+            return
+        del self.filtered_slots[position]
+        if position < self.view_offset + self.window_size():
+            self.render_window()
+        else:
+            self.update_scrollbar()
 
     def clear_form(self):
         for entry in self.entries.values():
@@ -150,6 +394,9 @@ class InventoryApp(tk.Tk):
         if not selection:
             return
         values = self.tree.item(selection[0], "values")
+        if values[0] == self.selected_id:
+            return
+        self.selected_id = values[0]
         field_order = ["id", "name", "category", "quantity", "price", "location"]
         for value, field in zip(values, field_order):
             self.entries[field].delete(0, tk.END)
@@ -161,39 +408,14 @@ class InventoryApp(tk.Tk):
         data = {}
         id_value = self.entries["id"].get().strip()
         if not id_value:
-            id_value = self.generate_id()
-        elif require_unique_id and any(item["id"] == id_value for item in self.items):
+            id_value = self.records().allocate_id()
+        elif require_unique_id and id_value in self.records():
             errors.append(("id", "ID має бути унікальним"))
         data["id"] = id_value
 
-        name = self.entries["name"].get().strip()
-        if not name:
-            errors.append(("name", "Назва не може бути порожньою"))
-        data["name"] = name
-        category = self.entries["category"].get().strip()
-        if not category:
-            errors.append(("category", "Категорія не може бути порожньою"))
-        data["category"] = category
-        quantity_raw = self.entries["quantity"].get().strip()
-        try:
-            quantity = int(quantity_raw)
-            if quantity < 0:
-                raise ValueError
-        except ValueError:
-            errors.append(("quantity", "Кількість має бути цілим числом ≥ 0"))
-            quantity = 0
-        data["quantity"] = quantity
-        price_raw = self.entries["price"].get().strip().replace(",", ".")
-        try:
-            price = float(price_raw)
-            if price < 0:
-                raise ValueError
-        except ValueError:
-            errors.append(("price", "Ціна має бути числом ≥ 0"))
-            price = 0.0
-        data["price"] = price
-        location = self.entries["location"].get().strip()
-        data["location"] = location
+        fields, field_errors = validate_fields({field: entry.get() for field, entry in self.entries.items()})
+        data.update(fields)
+        errors.extend(field_errors)
 
         for entry in self.entries.values():
             entry.configure(style="TEntry")
@@ -204,69 +426,126 @@ class InventoryApp(tk.Tk):
             return None
         return data
 
-    def generate_id(self):
-        existing_ids = {item["id"] for item in self.items}
-        base = len(self.items) + 1
-        new_id = str(base)
-        while new_id in existing_ids:
-            base += 1
-            new_id = str(base)
-        return new_id
+    def records(self):
+        return self.items if self.db is None else self.db
+
+    def record_change(self, change):
+        if self.db is None:
+            self.pending_changes.append(change)
+
+    def store_add(self, item):
+        if self.db is not None:
+            self.db.add(item)
+            self.db_count += self.db.matches(item["id"], self.db_query)
+            self.render_window()
+            self.restart_pending_filter()
+            return
+        slot = self.items.add(item)
+        self.sort_orders.insert(slot)
+        self.search_index.add(slot, self.items.search_fields(slot))
+        self.insert_row(slot)
+        self.restart_pending_filter()
+
+    def store_replace(self, old_item, item):
+        if self.db is not None:
+            self.db_count -= self.db.matches(old_item["id"], self.db_query)
+            self.db.replace(old_item["id"], item)
+            self.db_count += self.db.matches(item["id"], self.db_query)
+            self.render_window()
+            self.restart_pending_filter()
+            return
+        self.sort_orders.discard(self.items.slot_of(old_item["id"]))
+        slot = self.items.replace(old_item["id"], item)
+        self.sort_orders.insert(slot)
+        self.search_index.replace(slot, self.items.search_fields(slot))
+        self.replace_row(slot)
+        self.restart_pending_filter()
+
+    def store_remove(self, item):
+        if self.db is not None:
+            self.db_count -= self.db.matches(item["id"], self.db_query)
+            self.db.remove(item["id"])
+            self.render_window()
+            self.restart_pending_filter()
+            return
+        slot = self.items.slot_of(item["id"])
+        self.sort_orders.discard(slot)
+        self.items.remove(item["id"])
+        self.remove_row(slot)
+        if self.items.needs_compaction():
+            self.compact_inventory()
+        self.restart_pending_filter()
+
+    def compact_inventory(self):
+        remap = self.items.compact()
+        self.sort_orders.remap(remap)
+        self.search_index.build(self.items)
+        self.filtered_slots = array("l", (remap[slot] for slot in self.filtered_slots))
 
     def add_item(self):
         validated = self.validate_form(require_unique_id=True)
         if not validated:
             return
         validated["created_at"] = datetime.now().strftime(DATE_FORMAT)
-        self.items.append(validated)
-        self.apply_filter()
+        self.store_add(validated)
+        self.record_change({"op": "add", "item": validated})
         self.clear_form()
         self.update_status("Запис додано")
 
-    def get_selected_item_index(self):
-        selection = self.tree.selection()
-        if not selection:
+    def get_selected_item(self):
+        if self.selected_id is None:
             return None
-        selected_id = self.tree.item(selection[0], "values")[0]
-        for idx, item in enumerate(self.items):
-            if item["id"] == selected_id:
-                return idx
-        return None
+        return self.records().get(self.selected_id)
 
     def update_item(self):
-        index = self.get_selected_item_index()
-        if index is None:
+        old_item = self.get_selected_item()
+        if old_item is None:
             self.update_status("Оберіть запис для оновлення")
             messagebox.showinfo("Оновлення", "Будь ласка, виберіть запис у таблиці")
             return
         validated = self.validate_form(require_unique_id=False)
         if not validated:
             return
-        selected_id = self.items[index]["id"]
-        if validated["id"] != selected_id and any(item["id"] == validated["id"] for item in self.items):
+        if validated["id"] != old_item["id"] and validated["id"] in self.records():
             self.entries["id"].configure(style="Invalid.TEntry")
             self.update_status("ID має бути унікальним")
             return
 
-        validated["created_at"] = self.items[index]["created_at"]
-        self.items[index] = validated
-        self.apply_filter()
+        validated["created_at"] = old_item["created_at"]
+        self.selected_id = validated["id"]
+        self.store_replace(old_item, validated)
+        self.record_change({"op": "update", "id": old_item["id"], "item": validated})
         self.update_status("Запис оновлено")
 
     def delete_item(self):
-        index = self.get_selected_item_index()
-        if index is None:
+        selected = self.get_selected_item()
+        if selected is None:
             self.update_status("Оберіть запис для видалення")
             messagebox.showinfo("Видалення", "Будь ласка, виберіть запис у таблиці")
             return
         confirm = messagebox.askyesno("Підтвердження", "Видалити вибраний запис?")
         if not confirm:
             return
-        del self.items[index]
-        self.apply_filter()
+        self.selected_id = None
+        self.store_remove(selected)
+        self.record_change({"op": "delete", "id": selected["id"]})
         self.clear_form()
         self.update_status("Запис видалено")
 
+    def apply_journal(self, ops):
+        for op in ops:
+            if op["op"] == "add":
+                if op["item"]["id"] not in self.items:
+                    self.store_add(op["item"])
+                continue
+            old_item = self.items.get(op["id"])
+            if old_item is None:
+                continue
+            if op["op"] == "delete":
+                self.store_remove(old_item)
+            elif op["item"]["id"] == op["id"] or op["item"]["id"] not in self.items:
+                self.store_replace(old_item, op["item"])
+
     def load_csv(self):
         path = filedialog.askopenfilename(
             title="Відкрити CSV",
@@ -274,39 +553,194 @@ class InventoryApp(tk.Tk):
         )
         if not path:
             return
-        try:
-            with open(path, newline="", encoding="utf-8") as f:
-                reader = csv.DictReader(f)
-                if reader.fieldnames is None or [h.strip() for h in reader.fieldnames] != list(COLUMNS):
-                    raise ValueError("Неправильні заголовки CSV")
-                loaded_items = []
-                for row in reader:
-                    try:
-                        loaded_items.append(
-                            {
-                                "id": row["id"],
-                                "name": row["name"],
-                                "category": row["category"],
-                                "quantity": int(row["quantity"]),
-                                "price": float(row["price"]),
-                                "location": row.get("location", ""),
-                                "created_at": row.get("created_at", ""),
-                            }
-                        )
-                    except (TypeError, ValueError, KeyError):
-                        raise ValueError("Неправильний формат даних у CSV")
-        except Exception as exc:
-            messagebox.showerror("Помилка", f"Не вдалося завантажити файл:\n{exc}")
+        self.cancel_load()
+        self.loader = CsvLoader(path, self.load_results)
+        self.load_started = False
+        self.imported_count = 0
+        self.loader.start()
+        self.progress["value"] = 0
+        self.progress.pack(fill=tk.X, side=tk.BOTTOM, padx=10)
+        self.update_status(f"Завантаження {os.path.basename(path)}…")
+        if self.load_poll_job is None:
+            self.load_poll_job = self.after(LOAD_POLL_MS, self.poll_load)
+
+    def cancel_load(self):
+        if self.loader is None:
+            return
+        self.loader.cancel()
+        self.loader = None
+        self.progress.pack_forget()
+        self.resort_view()
+        self.update_status(f"Завантаження скасовано, записів: {len(self.items)}")
+
+    def poll_load(self):
+        self.load_poll_job = None
+        for _ in range(BATCHES_PER_TICK):
+            if self.loader is None:
+                return
+            try:
+                kind, source, *payload = self.load_results.get_nowait()
+            except queue.Empty:
+                break
+            if source is not self.loader:
+                continue
+            if kind == "batch":
+                self.receive_batch(*payload)
+            elif kind == "failed":
+                self.finish_load(error=payload[0])
+            else:
+                self.finish_load()
+        if self.loader is not None:
+            self.load_poll_job = self.after(LOAD_POLL_MS, self.poll_load)
+
+    def begin_load(self):
+        self.load_started = True
+        if self.db is None:
+            self.reset_inventory()
+
+    def reset_inventory(self):
+        self.items = ItemTable()
+        self.sort_orders = SortOrders(self.items)
+        self.active_sort = None
+        self.current_file = None
+        self.journal = None
+        self.pending_changes = []
+        self.query_generation += 1
+        self.pending_query = None
+        self.search_index = SearchIndex(self.items)
+        self.filtered_slots = array("l")
+        self.refresh_tree()
+
+    def receive_batch(self, batch, progress):
+        if not self.load_started:
+            self.begin_load()
+        self.progress["value"] = progress
+        if self.db is not None:
+            duplicates = self.db.add_batch(batch)
+            for item_id in duplicates:
+                self.loader.report(None, f"Повторюваний ID: {item_id}")
+            self.imported_count += len(batch) - len(duplicates)
+            self.update_status(f"Імпортовано {self.imported_count} записів…")
+            self.restart_pending_filter()
+            return
+        # Вставка кожного рядка в кешовані порядки й відсортований вигляд коштує O(n) на рядок,
+        # тож під час завантаження рядки дописуються в кінець, а сортування відновлює resort_view().
+        query = self.current_query()
+        first_changed = len(self.filtered_slots)
+        for item in batch:
+            if item["id"] in self.items:
+                self.loader.report(None, f"Повторюваний ID: {item['id']}")
+                continue
+            slot = self.items.add(item)
+            self.search_index.add(slot, self.items.search_fields(slot))
+            if self.search_index.matches(slot, query):
+                self.filtered_slots.append(slot)
+        self.sort_orders.clear()
+        if first_changed < self.view_offset + self.window_size():
+            self.render_window()
+        else:
+            self.update_scrollbar()
+        self.update_status(f"Завантажено {len(self.items)} записів…")
+        self.restart_pending_filter()
+
+    def resort_view(self):
+        if self.db is None and self.active_sort is not None:
+            self.filtered_slots = self.sort_orders.sorted_view(self.filtered_slots, *self.active_sort)
+            self.render_window()
+
+    def finish_load(self, error=None):
+        loader = self.loader
+        self.loader = None
+        self.progress.pack_forget()
+        self.resort_view()
+        if error is not None:
+            messagebox.showerror("Помилка", f"Не вдалося завантажити файл:\n{error}")
             self.update_status("Помилка завантаження CSV")
             return
-        self.items = loaded_items
-        self.filtered_items = list(self.items)
+        if self.db is not None:
+            self.finish_import(loader)
+            return
+        self.journal = Journal(loader.path, loader.identity)
+        try:
+            self.apply_journal(self.journal.read())
+        except (OSError, KeyError, TypeError) as exc:
+            messagebox.showerror("Помилка", f"Не вдалося прочитати журнал змін:\n{exc}")
+            self.journal = None
+        self.current_file = loader.path
+        status = f"Завантажено {len(self.items)} записів"
+        if loader.error_count:
+            status += f", пропущено рядків: {loader.error_count}"
+            messagebox.showwarning("Пропущені рядки", loader.error_report())
+        self.update_status(status)
+
+    def finish_import(self, loader):
+        self.db_count = self.db.count(self.db_query)
+        self.render_window()
+        status = f"Імпортовано {self.imported_count} записів у {os.path.basename(self.db.path)}"
+        if loader.error_count:
+            status += f", пропущено рядків: {loader.error_count}"
+            messagebox.showwarning("Пропущені рядки", loader.error_report())
+        self.update_status(status)
+
+    def open_database(self):
+        path = filedialog.asksaveasfilename(
+            title="Відкрити або створити базу SQLite",
+            defaultextension=".sqlite",
+            filetypes=(("База SQLite", "*.sqlite *.db"), ("Усі файли", "*.*")),
+            confirmoverwrite=False,
+        )
+        if not path:
+            return
+        try:
+            db = SqliteStore(path)
+        except sqlite3.Error as exc:
+            messagebox.showerror("Помилка", f"Не вдалося відкрити базу:\n{exc}")
+            self.update_status("Помилка відкриття бази")
+            return
+        self.cancel_load()
+        if self.db is not None:
+            self.db.close()
+        self.db = db
+        self.reset_inventory()
+        self.db_query = self.current_query()
+        self.db_count = self.db.count(self.db_query)
         self.refresh_tree()
-        self.current_file = path
-        self.update_status(f"Завантажено {len(self.items)} записів")
+        self.update_status(f"Відкрито базу {os.path.basename(path)}: записів {self.db_count}")
+
+    def close_database(self):
+        if self.db is None:
+            return
+        self.cancel_load()
+        self.db.close()
+        self.db = None
+        self.reset_inventory()
+        self.update_status("Базу закрито")
+
+    def export_database(self):
+        path = filedialog.asksaveasfilename(
+            title="Експортувати в CSV",
+            defaultextension=".csv",
+            filetypes=(("CSV файли", "*.csv"), ("Усі файли", "*.*")),
+        )
+        if not path:
+            return
+        try:
+            write_csv_atomic(path, self.db)
+        except (OSError, sqlite3.Error) as exc:
+            messagebox.showerror("Помилка", f"Не вдалося зберегти файл:\n{exc}")
+            self.update_status("Помилка збереження CSV")
+            return
+        self.update_status(f"Експортовано {len(self.db)} записів у {os.path.basename(path)}")
 
     def save_csv(self, save_as=False):
-        if save_as or not self.current_file:
+        if self.db is not None:
+            if save_as:
+                self.export_database()
+            else:
+                self.update_status("Зміни в базі зберігаються одразу")
+            return
+        full_save = save_as or not self.current_file
+        if full_save:
             path = filedialog.asksaveasfilename(
                 title="Зберегти CSV",
                 defaultextension=".csv",
@@ -315,28 +749,71 @@ class InventoryApp(tk.Tk):
             if not path:
                 return
             self.current_file = path
+        if self.compactor is not None:
+            self.save_requested = True
+            self.update_status("Триває ущільнення журналу, зміни буде збережено після нього")
+            return
         try:
-            with open(self.current_file, "w", newline="", encoding="utf-8") as f:
-                writer = csv.DictWriter(f, fieldnames=COLUMNS)
-                writer.writeheader()
-                for item in self.items:
-                    writer.writerow(item)
+            if full_save or self.journal is None or self.journal.csv_path != self.current_file or not self.journal.is_current():
+                self.journal = Journal(self.current_file)
+                self.journal.rewrite(self.items)
+                if self.items.holes:
+                    self.compact_inventory()
+                    self.restart_pending_filter()
+            elif self.pending_changes:
+                self.journal.append(self.pending_changes)
         except OSError as exc:
             messagebox.showerror("Помилка", f"Не вдалося зберегти файл:\n{exc}")
             self.update_status("Помилка збереження CSV")
             return
 
+        self.pending_changes = []
+        if self.journal.op_count >= JOURNAL_COMPACT_OPS:
+            self.start_compaction()
         self.update_status(f"Збережено {len(self.items)} записів у {os.path.basename(self.current_file)}")
 
+    def start_compaction(self):
+        self.compaction_error = None
+        self.compactor = threading.Thread(
+            target=self.run_compaction,
+            args=(self.journal, self.items.snapshot()),
+            daemon=True,
+        )
+        self.compactor.start()
+        self.after(COMPACTION_POLL_MS, self.poll_compaction)
+
+    def run_compaction(self, journal, snapshot):
+        try:
+            journal.rewrite(snapshot)
+        except OSError as exc:
+            self.compaction_error = exc
+
+    def poll_compaction(self):
+        if self.compactor.is_alive():
+            self.after(COMPACTION_POLL_MS, self.poll_compaction)
+            return
+        self.compactor = None
+        if self.compaction_error is not None:
+            self.update_status(f"Не вдалося ущільнити журнал: {self.compaction_error}")
+        if self.save_requested:
+            self.save_requested = False
+            self.save_csv()
+
+    def reorder_view(self, column, reverse):
+        if self.active_sort is not None and self.active_sort[0] == column:
+            if self.active_sort[1] != reverse:
+                self.filtered_slots.reverse()
+        else:
+            self.filtered_slots = self.sort_orders.sorted_view(self.filtered_slots, column, reverse)
+
     def sort_by_column(self, column):
         reverse = self.sort_state.get(column, False)
         try:
-            if column in {"quantity", "price"}:
-                key_func = lambda item: float(item[column])
-            else:
-                key_func = lambda item: item[column]
-            self.filtered_items.sort(key=key_func, reverse=reverse)
+            if self.db is None:
+                self.reorder_view(column, reverse)
+            self.active_sort = (column, reverse)
             self.sort_state[column] = not reverse
+            self.restart_pending_filter()
             self.refresh_tree()
             direction = "спадання" if reverse else "зростання"
             self.update_status(f"Сортування за '{column}' ({direction})")
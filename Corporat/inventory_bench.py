@@ -0,0 +1,196 @@
+import argparse
+import csv
+import json
+import os
+import queue
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from inventory_csv import COLUMNS, DATE_FORMAT, CsvLoader, validate_fields, write_csv_atomic
+from inventory_journal import Journal
+from item_table import ItemTable
+from search_index import SearchIndex
+from sort_orders import SortOrders
+
+DEFAULT_SIZES = (10_000, 100_000, 1_000_000)
+DEFAULT_BASELINE = Path(__file__).with_name("bench_baseline.json")
+WINDOW_ROWS = 30
+MIN_REGRESSION_MS = 1.0
+QUERIES = ("a", "ol", "tool", "steel 4")
+WORDS = (
+    "steel", "tool", "paint", "cable", "lamp", "drill", "valve", "brush", "glue", "tape",
+    "screw", "bolt", "nut", "pipe", "hose", "saw", "mask", "glove", "filter", "switch",
+)
+
+
+def generate_inventory(path, size, seed=42):
+    rng = random.Random(seed)
+    categories = [f"{rng.choice(WORDS).title()} {i}" for i in range(50)]
+    locations = [f"{chr(65 + i % 26)}{i // 26}-{rng.randint(1, 9)}" for i in range(200)]
+    started = time.mktime(time.strptime("2023-01-01 00:00:00", DATE_FORMAT))
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(COLUMNS)
+        for i in range(1, size + 1):
+            writer.writerow((
+                i,
+                f"{rng.choice(WORDS)} {rng.choice(WORDS)} {rng.randint(1, 9999)}",
+                rng.choice(categories),
+                rng.randint(0, 5000),
+                f"{rng.uniform(0.5, 2000):.2f}",
+                rng.choice(locations),
+                time.strftime(DATE_FORMAT, time.localtime(started + i * 7)),
+            ))
+
+
+def load_table(path):
+    results = queue.Queue()
+    loader = CsvLoader(path, results)
+    loader.load()
+    table = ItemTable()
+    index = SearchIndex(table)
+    while True:
+        kind, _source, *payload = results.get_nowait()
+        if kind != "batch":
+            break
+        for item in payload[0]:
+            slot = table.add(item)
+            index.add(slot, table.search_fields(slot))
+    return table, index
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def measure(operation, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        operation()
+        samples.append(time.perf_counter() - started)
+    tracemalloc.start()
+    operation()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {
+        "p50_ms": percentile(samples, 0.5) * 1000,
+        "p95_ms": percentile(samples, 0.95) * 1000,
+        "max_ms": max(samples) * 1000,
+        "peak_mb": peak / 2**20,
+        "runs": repeat,
+    }
+
+
+def bench_size(size, data_dir, repeat):
+    path = os.path.join(data_dir, f"inventory_{size}.csv")
+    if not os.path.exists(path):
+        generate_inventory(path, size)
+    results = {}
+    results["load_csv"] = measure(lambda: load_table(path), max(1, repeat // 3))
+    table, index = load_table(path)
+    slots = table.slots()
+
+    for query in QUERIES:
+        results[f"apply_filter[{query}]"] = measure(lambda: index.search(query), repeat)
+
+    for column in ("quantity", "name"):
+        results[f"sort_by_column[{column}] cold"] = measure(
+            lambda: SortOrders(table).sorted_view(slots, column), max(1, repeat // 3)
+        )
+    orders = SortOrders(table)
+    view = orders.sorted_view(slots, "price")
+    results["sort_by_column[price] toggle"] = measure(view.reverse, repeat)
+    subset = index.search("tool")
+    results["sort_by_column[price] filtered"] = measure(lambda: orders.sorted_view(subset, "price"), repeat)
+
+    rng = random.Random(size)
+    offsets = [rng.randrange(max(1, len(slots) - WINDOW_ROWS)) for _ in range(repeat * 20)]
+    offsets_iter = iter(offsets * 2)
+
+    def render_window():
+        offset = next(offsets_iter)
+        return [table.row_values(slot) for slot in slots[offset:offset + WINDOW_ROWS]]
+
+    results["refresh_tree window"] = measure(render_window, len(offsets))
+
+    raw = {"name": "steel tool", "category": "Tool 1", "quantity": "12", "price": "3,50", "location": "A1"}
+    results["validate_form"] = measure(lambda: (validate_fields(raw), str(size // 2) in table), repeat * 100)
+
+    with tempfile.TemporaryDirectory() as save_dir:
+        target = os.path.join(save_dir, "inventory.csv")
+        results["save_csv full"] = measure(lambda: write_csv_atomic(target, table), max(1, repeat // 3))
+        journal = Journal(target, [0, 0, 0])
+        changes = [{"op": "update", "id": table.ids[slot], "item": table.record(slot)} for slot in slots[:10]]
+        results["save_csv journal"] = measure(lambda: journal.append(changes), repeat)
+    return results
+
+
+def compare(results, baseline, tolerance):
+    regressions = []
+    for size, operations in results.items():
+        for name, stats in operations.items():
+            reference = baseline.get(size, {}).get(name)
+            if reference is None:
+                continue
+            ratio = stats["p50_ms"] / max(reference["p50_ms"], 1e-6)
+            stats["vs_baseline"] = ratio
+            if ratio > 1 + tolerance and stats["p50_ms"] - reference["p50_ms"] > MIN_REGRESSION_MS:
+                regressions.append((size, name, ratio))
+    return regressions
+
+
+def print_results(results):
+    print(f"{'rows':>9}  {'operation':<34} {'p50 ms':>10} {'p95 ms':>10} {'max ms':>10} {'peak MB':>9} {'x base':>7}")
+    for size, operations in results.items():
+        for name, stats in operations.items():
+            ratio = stats.get("vs_baseline")
+            ratio_text = f"{ratio:7.2f}" if ratio is not None else f"{'-':>7}"
+            print(
+                f"{size:>9}  {name:<34} {stats['p50_ms']:10.3f} {stats['p95_ms']:10.3f} "
+                f"{stats['max_ms']:10.3f} {stats['peak_mb']:9.1f} {ratio_text}"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк гарячих шляхів InventoryApp на синтетичних даних.")
+    parser.add_argument(
+        "--sizes",
+        default=",".join(str(size) for size in DEFAULT_SIZES),
+        help="Розміри наборів через кому (default: 10000,100000,1000000)",
+    )
+    parser.add_argument("--repeat", type=int, default=9, help="Кількість вимірювань на операцію (default: 9)")
+    parser.add_argument("--data-dir", default=None, help="Тека для кешу згенерованих CSV (default: тимчасова)")
+    parser.add_argument("--baseline", default=str(DEFAULT_BASELINE), help="JSON із базовими результатами")
+    parser.add_argument("--save-baseline", action="store_true", help="Записати результати як нову базу")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Допустиме сповільнення p50 (default: 0.2)")
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(",")]
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        data_dir = args.data_dir or tmp_dir
+        os.makedirs(data_dir, exist_ok=True)
+        results = {str(size): bench_size(size, data_dir, args.repeat) for size in sizes}
+
+    baseline_path = Path(args.baseline)
+    regressions = []
+    if baseline_path.exists() and not args.save_baseline:
+        regressions = compare(results, json.loads(baseline_path.read_text()), args.tolerance)
+    print_results(results)
+    if args.save_baseline:
+        baseline_path.write_text(json.dumps(results, indent=2))
+        print(f"Базу збережено у {baseline_path}")
+    if regressions:
+        print("Регресії відносно бази:", file=sys.stderr)
+        for size, name, ratio in regressions:
+            print(f"  {size} рядків, {name}: у {ratio:.2f} раза повільніше", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+import csv
+import os
+import stat
+import tempfile
+import threading
+
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+COLUMNS = (
+    "id",
+    "name",
+    "category",
+    "quantity",
+    "price",
+    "location",
+    "created_at",
+)
+MAX_QUANTITY = 2**63 - 1
+BATCH_SIZE = 2000
+MAX_REPORTED_ERRORS = 1000
+REPORT_PREVIEW = 20
+
+
+def file_identity(path):
+    st = os.stat(path)
+    return [st.st_size, st.st_mtime_ns, st.st_ino]
+
+
+def target_mode(path):
+    # mkstemp створює файл з правами 0600, а os.replace їх зберігає: беремо права старого файлу
+    # або, для нового, звичайні 0666 з урахуванням umask.
+    try:
+        return stat.S_IMODE(os.stat(path).st_mode)
+    except FileNotFoundError:
+        umask = os.umask(0)
+        os.umask(umask)
+        return 0o666 & ~umask
+
+
+def write_csv_atomic(path, items):
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix=".", suffix=".tmp", dir=directory)
+    try:
+        os.fchmod(fd, target_mode(path))
+        with os.fdopen(fd, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=COLUMNS)
+            writer.writeheader()
+            writer.writerows(items)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def check_header(fieldnames):
+    if fieldnames is None or [h.strip() for h in fieldnames] != list(COLUMNS):
+        raise ValueError("Неправильні заголовки CSV")
+
+
+def parse_row(row):
+    try:
+        item = {
+            "id": row["id"],
+            "name": row["name"],
+            "category": row["category"],
+            "quantity": int(row["quantity"]),
+            "price": float(row["price"]),
+            "location": row.get("location") or "",
+            "created_at": row.get("created_at") or "",
+        }
+    except (TypeError, ValueError, KeyError):
+        raise ValueError("Неправильний формат даних у CSV")
+    if not -MAX_QUANTITY <= item["quantity"] <= MAX_QUANTITY:
+        raise ValueError("Неправильний формат даних у CSV")
+    return item
+
+
+def validate_fields(raw):
+    errors = []
+    data = {}
+    name = (raw.get("name") or "").strip()
+    if not name:
+        errors.append(("name", "Назва не може бути порожньою"))
+    data["name"] = name
+    category = (raw.get("category") or "").strip()
+    if not category:
+        errors.append(("category", "Категорія не може бути порожньою"))
+    data["category"] = category
+    quantity_raw = (raw.get("quantity") or "").strip()
+    try:
+        quantity = int(quantity_raw)
+        if not 0 <= quantity <= MAX_QUANTITY:
+            raise ValueError
+    except ValueError:
+        errors.append(("quantity", "Кількість має бути цілим числом ≥ 0"))
+        quantity = 0
+    data["quantity"] = quantity
+    price_raw = (raw.get("price") or "").strip().replace(",", ".")
+    try:
+        price = float(price_raw)
+        if price < 0:
+            raise ValueError
+    except ValueError:
+        errors.append(("price", "Ціна має бути числом ≥ 0"))
+        price = 0.0
+    data["price"] = price
+    data["location"] = (raw.get("location") or "").strip()
+    return data, errors
+
+
+class CsvLoader(threading.Thread):
+    def __init__(self, path, results):
+        super().__init__(daemon=True)
+        self.path = path
+        self.results = results
+        self.cancelled = threading.Event()
+        self.errors = []
+        self.error_count = 0
+        self.identity = None
+
+    def cancel(self):
+        self.cancelled.set()
+
+    def report(self, line, message):
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append((line, str(message)))
+
+    def error_report(self):
+        lines = [
+            f"Рядок {line}: {message}" if line is not None else message
+            for line, message in self.errors[:REPORT_PREVIEW]
+        ]
+        if self.error_count > len(lines):
+            lines.append(f"… та ще {self.error_count - len(lines)}")
+        return "\n".join(lines)
+
+    def run(self):
+        try:
+            self.load()
+        except (OSError, UnicodeDecodeError, csv.Error, ValueError) as exc:
+            self.results.put(("failed", self, str(exc)))
+
+    def load(self):
+        self.identity = file_identity(self.path)
+        total_size = self.identity[0] or 1
+        with open(self.path, newline="", encoding="utf-8") as f:
+            reader = csv.DictReader(f)
+            check_header(reader.fieldnames)
+            seen_ids = set()
+            batch = []
+            for row in reader:
+                if self.cancelled.is_set():
+                    return
+                try:
+                    item = parse_row(row)
+                    if item["id"] in seen_ids:
+                        raise ValueError(f"Повторюваний ID: {item['id']}")
+                except ValueError as exc:
+                    self.report(reader.line_num, exc)
+                    continue
+                seen_ids.add(item["id"])
+                batch.append(item)
+                if len(batch) >= BATCH_SIZE:
+                    self.results.put(("batch", self, batch, f.buffer.tell() / total_size))
+                    batch = []
+        self.results.put(("batch", self, batch, 1.0))
+        self.results.put(("done", self))
@@ -0,0 +1,87 @@
+import json
+import os
+
+from inventory_csv import file_identity, write_csv_atomic
+
+JOURNAL_SUFFIX = ".journal"
+JOURNAL_COMPACT_OPS = 1000
+COMMIT_RECORD = b'{"op": "commit"}\n'
+
+
+class Journal:
+    def __init__(self, csv_path, base=None):
+        self.csv_path = csv_path
+        self.path = csv_path + JOURNAL_SUFFIX
+        self.base = base
+        self.committed_size = 0
+        self.op_count = 0
+
+    def read(self):
+        try:
+            f = open(self.path, "rb")
+        except FileNotFoundError:
+            return []
+        committed = []
+        block = []
+        with f:
+            header = f.readline()
+            try:
+                if json.loads(header).get("base") != self.base:
+                    return []
+            except ValueError:
+                return []
+            offset = len(header)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    break
+                offset += len(line)
+                if record["op"] == "commit":
+                    committed.extend(block)
+                    block = []
+                    self.committed_size = offset
+                else:
+                    block.append(record)
+        if not self.committed_size:
+            self.committed_size = len(header)
+        self.op_count = len(committed)
+        return committed
+
+    def is_current(self):
+        try:
+            return self.base is not None and file_identity(self.csv_path) == self.base
+        except OSError:
+            return False
+
+    def append(self, ops):
+        payload = b"".join(json.dumps(op, ensure_ascii=False).encode("utf-8") + b"\n" for op in ops)
+        if not self.committed_size:
+            with open(self.path, "wb") as f:
+                f.write(json.dumps({"base": self.base}).encode("utf-8") + b"\n")
+                f.flush()
+                os.fsync(f.fileno())
+                self.committed_size = f.tell()
+        with open(self.path, "r+b") as f:
+            f.truncate(self.committed_size)
+            f.seek(self.committed_size)
+            f.write(payload + COMMIT_RECORD)
+            f.flush()
+            os.fsync(f.fileno())
+            self.committed_size = f.tell()
+        self.op_count += len(ops)
+
+    def discard(self):
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+        self.committed_size = 0
+        self.op_count = 0
+
+    def rewrite(self, items):
+        write_csv_atomic(self.csv_path, items)
+        self.discard()
+        self.base = file_identity(self.csv_path)
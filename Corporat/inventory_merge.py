@@ -0,0 +1,118 @@
+import argparse
+import csv
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from inventory_csv import COLUMNS, REPORT_PREVIEW, check_header, validate_fields, write_csv_atomic
+
+POLICIES = ("first", "last", "newest", "error")
+
+
+def parse_file(path):
+    started = time.perf_counter()
+    rows = []
+    errors = []
+    row_count = 0
+    try:
+        with open(path, newline="", encoding="utf-8") as f:
+            reader = csv.DictReader(f)
+            check_header(reader.fieldnames)
+            for row in reader:
+                row_count += 1
+                item_id = (row.get("id") or "").strip()
+                fields, field_errors = validate_fields(row)
+                if not item_id:
+                    field_errors.insert(0, ("id", "ID не може бути порожнім"))
+                if field_errors:
+                    errors.append((reader.line_num, field_errors[0][1]))
+                    continue
+                rows.append((
+                    item_id,
+                    fields["name"],
+                    fields["category"],
+                    fields["quantity"],
+                    fields["price"],
+                    fields["location"],
+                    (row.get("created_at") or "").strip(),
+                ))
+    except (OSError, UnicodeDecodeError, csv.Error, ValueError) as exc:
+        return path, None, [(None, str(exc))], row_count, time.perf_counter() - started
+    return path, rows, errors, row_count, time.perf_counter() - started
+
+
+def merge(results, policy):
+    merged = {}
+    conflicts = []
+    for path, rows, _errors, _row_count, _elapsed in results:
+        for row in rows or ():
+            current = merged.get(row[0])
+            if current is None:
+                merged[row[0]] = row
+                continue
+            conflicts.append((row[0], path))
+            if policy == "last" or (policy == "newest" and row[6] > current[6]):
+                merged[row[0]] = row
+    return merged, conflicts
+
+
+def print_errors(path, errors):
+    for line, message in errors[:REPORT_PREVIEW]:
+        where = f"{path}:{line}" if line is not None else path
+        print(f"  {where}: {message}", file=sys.stderr)
+    if len(errors) > REPORT_PREVIEW:
+        print(f"  … та ще {len(errors) - REPORT_PREVIEW}", file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Об'єднання CSV-файлів обліку товарів без графічного інтерфейсу.")
+    parser.add_argument("output", help="Шлях до об'єднаного CSV-файлу")
+    parser.add_argument("inputs", nargs="+", help="Вхідні CSV-файли у форматі InventoryApp")
+    parser.add_argument(
+        "--policy",
+        choices=POLICIES,
+        default="last",
+        help="Що робити з повторюваними ID: first/last — залишити перший/останній запис, "
+        "newest — запис із новішим created_at, error — завершити з помилкою (default: last)",
+    )
+    parser.add_argument("--workers", type=int, default=None, help="Кількість процесів (default: усі ядра)")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        results = list(pool.map(parse_file, args.inputs))
+    parsed_at = time.perf_counter()
+
+    failed = False
+    total_rows = 0
+    for path, rows, errors, row_count, elapsed in results:
+        total_rows += row_count
+        if rows is None:
+            failed = True
+            print(f"{path}: не вдалося прочитати", file=sys.stderr)
+        else:
+            print(f"{path}: {row_count} рядків, помилок {len(errors)}, {elapsed:.2f} с")
+        print_errors(path, errors)
+
+    if failed:
+        sys.exit(1)
+
+    merged, conflicts = merge(results, args.policy)
+    if conflicts and args.policy == "error":
+        print(f"Знайдено повторюваних ID: {len(conflicts)}", file=sys.stderr)
+        for item_id, path in conflicts[:REPORT_PREVIEW]:
+            print(f"  {item_id}: {path}", file=sys.stderr)
+        sys.exit(1)
+
+    write_csv_atomic(args.output, (dict(zip(COLUMNS, row)) for row in merged.values()))
+    finished = time.perf_counter()
+    total = finished - started
+    print(
+        f"Разом: {total_rows} рядків за {total:.2f} с "
+        f"(розбір {parsed_at - started:.2f} с, {total_rows / max(parsed_at - started, 1e-9):.0f} рядків/с), "
+        f"записів у {args.output}: {len(merged)}, конфліктів ID: {len(conflicts)}"
+    )
+
+
+if __name__ == "__main__":
+    main()
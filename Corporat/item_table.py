@@ -0,0 +1,181 @@
+from array import array
+from itertools import compress
+
+COMPACT_RATIO = 0.5
+STORED_COLUMNS = ("ids", "names", "category_codes", "quantities", "prices", "location_codes", "created")
+
+
+class StringPool:
+    def __init__(self):
+        self.values = []
+        self.codes = {}
+
+    def encode(self, value):
+        code = self.codes.get(value)
+        if code is None:
+            code = len(self.values)
+            self.codes[value] = code
+            self.values.append(value)
+        return code
+
+
+class ItemTable:
+    def __init__(self, items=()):
+        self.ids = []
+        self.names = []
+        self.categories = StringPool()
+        self.category_codes = array("I")
+        self.quantities = array("q")
+        self.prices = array("d")
+        self.locations = StringPool()
+        self.location_codes = array("I")
+        self.created = []
+        self.alive = bytearray()
+        self.positions = {}
+        self.holes = 0
+        self.next_id = 1
+        for item in items:
+            self.add(item)
+
+    def __len__(self):
+        return len(self.positions)
+
+    def __iter__(self):
+        return (self.record(slot) for slot in self.slots())
+
+    def __contains__(self, item_id):
+        return item_id in self.positions
+
+    def slots(self):
+        return array("l", compress(range(len(self.alive)), self.alive))
+
+    def slot_of(self, item_id):
+        return self.positions.get(item_id)
+
+    def get(self, item_id):
+        slot = self.positions.get(item_id)
+        return None if slot is None else self.record(slot)
+
+    def category(self, slot):
+        return self.categories.values[self.category_codes[slot]]
+
+    def location(self, slot):
+        return self.locations.values[self.location_codes[slot]]
+
+    def record(self, slot):
+        return {
+            "id": self.ids[slot],
+            "name": self.names[slot],
+            "category": self.category(slot),
+            "quantity": self.quantities[slot],
+            "price": self.prices[slot],
+            "location": self.location(slot),
+            "created_at": self.created[slot],
+        }
+
+    def row_values(self, slot):
+        return (
+            self.ids[slot],
+            self.names[slot],
+            self.category(slot),
+            self.quantities[slot],
+            f"{self.prices[slot]:.2f}",
+            self.location(slot),
+            self.created[slot],
+        )
+
+    def column_getter(self, column):
+        if column == "category":
+            return self.category
+        if column == "location":
+            return self.location
+        columns = {
+            "id": self.ids,
+            "name": self.names,
+            "quantity": self.quantities,
+            "price": self.prices,
+            "created_at": self.created,
+        }
+        return columns[column].__getitem__
+
+    def search_fields(self, slot):
+        return self.names[slot], self.category(slot)
+
+    def reserve_id(self, item_id):
+        try:
+            number = int(item_id)
+        except ValueError:
+            return
+        if number >= self.next_id:
+            self.next_id = number + 1
+
+    def allocate_id(self):
+        new_id = str(self.next_id)
+        self.next_id += 1
+        return new_id
+
+    def add(self, item):
+        if item["id"] in self.positions:
+            raise KeyError(item["id"])
+        slot = len(self.alive)
+        self.ids.append(item["id"])
+        self.names.append(item["name"])
+        self.category_codes.append(self.categories.encode(item["category"]))
+        self.quantities.append(item["quantity"])
+        self.prices.append(item["price"])
+        self.location_codes.append(self.locations.encode(item["location"]))
+        self.created.append(item["created_at"])
+        self.alive.append(1)
+        self.positions[item["id"]] = slot
+        self.reserve_id(item["id"])
+        return slot
+
+    def replace(self, old_id, item):
+        if item["id"] != old_id and item["id"] in self.positions:
+            raise KeyError(item["id"])
+        slot = self.positions.pop(old_id)
+        self.positions[item["id"]] = slot
+        self.ids[slot] = item["id"]
+        self.names[slot] = item["name"]
+        self.category_codes[slot] = self.categories.encode(item["category"])
+        self.quantities[slot] = item["quantity"]
+        self.prices[slot] = item["price"]
+        self.location_codes[slot] = self.locations.encode(item["location"])
+        self.created[slot] = item["created_at"]
+        self.reserve_id(item["id"])
+        return slot
+
+    def remove(self, item_id):
+        slot = self.positions.pop(item_id)
+        item = self.record(slot)
+        self.alive[slot] = 0
+        self.ids[slot] = None
+        self.names[slot] = None
+        self.created[slot] = None
+        self.holes += 1
+        return item
+
+    def needs_compaction(self):
+        return self.holes > len(self.alive) * COMPACT_RATIO
+
+    def compact(self):
+        # Повертає відображення старий слот -> новий (-1 для видалених), щоб перенумерувати похідні структури.
+        remap = array("l", [-1]) * len(self.alive)
+        for new_slot, old_slot in enumerate(self.slots()):
+            remap[old_slot] = new_slot
+        for column in STORED_COLUMNS:
+            values = getattr(self, column)
+            kept = compress(values, self.alive)
+            setattr(self, column, array(values.typecode, kept) if isinstance(values, array) else list(kept))
+        self.alive = bytearray(b"\x01") * len(self.ids)
+        self.positions = {item_id: slot for slot, item_id in enumerate(self.ids)}
+        self.holes = 0
+        return remap
+
+    def snapshot(self):
+        copy = ItemTable.__new__(ItemTable)
+        copy.__dict__.update(self.__dict__)
+        for column in STORED_COLUMNS + ("alive",):
+            setattr(copy, column, getattr(self, column)[:])
+        copy.positions = self.positions.copy()
+        return copy
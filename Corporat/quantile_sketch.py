@@ -0,0 +1,86 @@
+import math
+from collections import Counter
+
+import numpy as np
+
+DEFAULT_RELATIVE_ERROR = 0.01
+
+
+# Лог-бакетний скетч (DDSketch): квантилі з відносною похибкою не більше relative_error,
+# пам'ять залежить лише від діапазону значень, скетчі з однаковою похибкою зливаються точно.
+class QuantileSketch:
+    def __init__(self, relative_error: float = DEFAULT_RELATIVE_ERROR) -> None:
+        if not 0 < relative_error < 1:
+            raise ValueError("Відносна похибка має бути в межах (0, 1)")
+        self.relative_error = relative_error
+        self.gamma = (1 + relative_error) / (1 - relative_error)
+        self.log_gamma = math.log(self.gamma)
+        self.positive: Counter = Counter()
+        self.negative: Counter = Counter()
+        self.zeros = 0
+        self.count = 0
+
+    def bucket_counts(self, values: np.ndarray) -> Counter:
+        indices = np.ceil(np.log(values) / self.log_gamma).astype(np.int64)
+        buckets, counts = np.unique(indices, return_counts=True)
+        return Counter(dict(zip(buckets.tolist(), counts.tolist())))
+
+    def update(self, values: np.ndarray) -> None:
+        values = np.asarray(values, dtype=float)
+        values = values[~np.isnan(values)]
+        self.positive.update(self.bucket_counts(values[values > 0]))
+        self.negative.update(self.bucket_counts(-values[values < 0]))
+        self.zeros += int(np.count_nonzero(values == 0))
+        self.count += len(values)
+
+    def merge(self, other: "QuantileSketch") -> None:
+        if other.relative_error != self.relative_error:
+            raise ValueError("Не можна зливати скетчі з різною похибкою")
+        self.positive.update(other.positive)
+        self.negative.update(other.negative)
+        self.zeros += other.zeros
+        self.count += other.count
+
+    def value(self, bucket: int) -> float:
+        return 2 * self.gamma**bucket / (self.gamma + 1)
+
+    def at_rank(self, rank: int) -> float:
+        seen = 0
+        for bucket in sorted(self.negative, reverse=True):
+            seen += self.negative[bucket]
+            if rank < seen:
+                return -self.value(bucket)
+        seen += self.zeros
+        if rank < seen:
+            return 0.0
+        for bucket in sorted(self.positive):
+            seen += self.positive[bucket]
+            if rank < seen:
+                return self.value(bucket)
+        raise IndexError(rank)
+
+    def quantile(self, q: float) -> float:
+        if not self.count:
+            return math.nan
+        position = q * (self.count - 1)
+        lower = self.at_rank(math.floor(position))
+        upper = self.at_rank(math.ceil(position))
+        return lower + (upper - lower) * (position - math.floor(position))
+
+    def to_dict(self) -> dict:
+        return {
+            "relative_error": self.relative_error,
+            "positive": {str(bucket): count for bucket, count in self.positive.items()},
+            "negative": {str(bucket): count for bucket, count in self.negative.items()},
+            "zeros": self.zeros,
+            "count": self.count,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "QuantileSketch":
+        sketch = cls(data["relative_error"])
+        sketch.positive = Counter({int(bucket): count for bucket, count in data["positive"].items()})
+        sketch.negative = Counter({int(bucket): count for bucket, count in data["negative"].items()})
+        sketch.zeros = data["zeros"]
+        sketch.count = data["count"]
+        return sketch
@@ -0,0 +1,79 @@
+from array import array
+from bisect import bisect_left
+from itertools import compress, islice
+
+NGRAM = 3
+FIELD_SEPARATOR = "\x00"
+CANCEL_CHECK_EVERY = 8192
+
+
+def ngrams(text):
+    return {text[i:i + NGRAM] for i in range(len(text) - NGRAM + 1)}
+
+
+def search_key(fields):
+    return FIELD_SEPARATOR.join(fields).lower()
+
+
+class SearchIndex:
+    # Списки слотів на кожну триграму — array("l") у порядку слотів, без копії тексту рядків:
+    # кандидатів перевіряє сама таблиця. Видалені слоти відсіює маска alive, а застарілі
+    # триграми після редагування — перевірка тексту; обидва зникають при перебудові після compact().
+    def __init__(self, table):
+        self.table = table
+        self.postings = {}
+
+    def clear(self):
+        self.postings.clear()
+
+    def build(self, table):
+        self.table = table
+        self.clear()
+        for slot in table.slots():
+            self.add(slot, table.search_fields(slot))
+
+    def add(self, slot, fields):
+        postings = self.postings
+        for gram in ngrams(search_key(fields)):
+            posting = postings.get(gram)
+            if posting is None:
+                postings[gram] = array("l", (slot,))
+            elif posting[-1] < slot:
+                posting.append(slot)
+            else:
+                position = bisect_left(posting, slot)
+                if position == len(posting) or posting[position] != slot:
+                    posting.insert(position, slot)
+
+    def replace(self, slot, fields):
+        self.add(slot, fields)
+
+    def key(self, slot):
+        return search_key(self.table.search_fields(slot))
+
+    def matches(self, slot, query):
+        return not query or query in self.key(slot)
+
+    def search(self, query, is_cancelled=None):
+        alive = self.table.alive
+        if len(query) < NGRAM:
+            return self.collect(compress(range(len(alive)), alive), query, is_cancelled)
+        # Лише get(): пошук іде у фоновому потоці й не повинен змінювати словник.
+        postings = sorted((self.postings.get(gram, ()) for gram in ngrams(query)), key=len)
+        if not postings[0]:
+            return array("l")
+        candidates = set(postings[0])
+        for posting in postings[1:]:
+            candidates.intersection_update(posting)
+        return self.collect((slot for slot in sorted(candidates) if alive[slot]), query, is_cancelled)
+
+    def collect(self, slots, query, is_cancelled):
+        result = array("l")
+        key = self.key
+        while True:
+            chunk = list(islice(slots, CANCEL_CHECK_EVERY))
+            if not chunk:
+                return result
+            if is_cancelled is not None and is_cancelled():
+                return None
+            result.extend(slot for slot in chunk if query in key(slot))
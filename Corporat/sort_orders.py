@@ -0,0 +1,65 @@
+from array import array
+from bisect import bisect_left
+
+
+class SortOrders:
+    def __init__(self, table):
+        self.table = table
+        self.orders = {}
+
+    def key(self, column):
+        getter = self.table.column_getter(column)
+        return lambda slot: (getter(slot), slot)
+
+    def order(self, column):
+        order = self.orders.get(column)
+        if order is None:
+            order = array("l", sorted(self.table.slots(), key=self.key(column)))
+            self.orders[column] = order
+        return order
+
+    def clear(self):
+        self.orders.clear()
+
+    def insert(self, slot):
+        for column, order in self.orders.items():
+            key = self.key(column)
+            order.insert(bisect_left(order, key(slot), key=key), slot)
+
+    def discard(self, slot):
+        for column, order in self.orders.items():
+            key = self.key(column)
+            position = bisect_left(order, key(slot), key=key)
+            if position < len(order) and order[position] == slot:
+                del order[position]
+
+    def remap(self, remap):
+        # Ущільнення зберігає відносний порядок слотів, тож відсортовані порядки лишаються відсортованими.
+        for column, order in self.orders.items():
+            self.orders[column] = array("l", (remap[slot] for slot in order))
+
+    def sorted_view(self, slots, column, reverse=False):
+        order = self.order(column)
+        if len(slots) == len(order):
+            view = array("l", order)
+        else:
+            mask = bytearray(len(self.table.alive))
+            for slot in slots:
+                mask[slot] = 1
+            view = array("l", filter(mask.__getitem__, order))
+        if reverse:
+            view.reverse()
+        return view
+
+    def view_position(self, view, slot, column, reverse=False):
+        key = self.key(column)
+        target = key(slot)
+        lo, hi = 0, len(view)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            current = key(view[mid])
+            if (current > target) if reverse else (current < target):
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
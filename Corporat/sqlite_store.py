@@ -0,0 +1,157 @@
+import sqlite3
+from contextlib import closing
+
+from inventory_csv import COLUMNS
+from search_index import search_key
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS items (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    category TEXT NOT NULL,
+    quantity INTEGER NOT NULL,
+    price REAL NOT NULL,
+    location TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    search_key TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS items_name ON items(name);
+CREATE INDEX IF NOT EXISTS items_category ON items(category);
+CREATE INDEX IF NOT EXISTS items_location ON items(location);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+SELECT_COLUMNS = ", ".join(COLUMNS)
+ID_CHUNK = 500
+
+
+def row_values(row):
+    return row[:4] + (f"{row[4]:.2f}",) + row[5:]
+
+
+class SqliteStore:
+    def __init__(self, path):
+        self.path = path
+        self.conn = self.connect()
+        self.conn.executescript(SCHEMA)
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'next_id'").fetchone()
+        self.next_id = row[0] if row else 1
+
+    def connect(self):
+        conn = sqlite3.connect(self.path, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def close(self):
+        self.conn.close()
+
+    @staticmethod
+    def where(query):
+        if not query:
+            return "", ()
+        return " WHERE instr(search_key, ?) > 0", (query,)
+
+    def count(self, query, conn=None):
+        clause, params = self.where(query)
+        conn = conn or self.conn
+        return conn.execute(f"SELECT COUNT(*) FROM items{clause}", params).fetchone()[0]
+
+    def count_in_thread(self, query):
+        with closing(self.connect()) as conn:
+            return self.count(query, conn)
+
+    def page(self, query, sort, offset, limit):
+        clause, params = self.where(query)
+        if sort is None:
+            order = "rowid"
+        else:
+            column, reverse = sort
+            if column not in COLUMNS:
+                raise ValueError(f"Невідома колонка: {column}")
+            direction = "DESC" if reverse else "ASC"
+            order = f"{column} {direction}, rowid {direction}"
+        rows = self.conn.execute(
+            f"SELECT {SELECT_COLUMNS} FROM items{clause} ORDER BY {order} LIMIT ? OFFSET ?",
+            params + (limit, offset),
+        )
+        return [row_values(row) for row in rows]
+
+    def __len__(self):
+        return self.count("")
+
+    def __contains__(self, item_id):
+        return self.conn.execute("SELECT 1 FROM items WHERE id = ?", (item_id,)).fetchone() is not None
+
+    def __iter__(self):
+        cursor = self.conn.execute(f"SELECT {SELECT_COLUMNS} FROM items ORDER BY rowid")
+        return (dict(zip(COLUMNS, row)) for row in cursor)
+
+    def get(self, item_id):
+        row = self.conn.execute(f"SELECT {SELECT_COLUMNS} FROM items WHERE id = ?", (item_id,)).fetchone()
+        return None if row is None else dict(zip(COLUMNS, row))
+
+    def matches(self, item_id, query):
+        clause, params = self.where(query)
+        clause = clause.replace("WHERE", "AND") if clause else ""
+        sql = f"SELECT 1 FROM items WHERE id = ?{clause}"
+        return self.conn.execute(sql, (item_id,) + params).fetchone() is not None
+
+    def reserve_ids(self, item_ids):
+        highest = self.next_id - 1
+        for item_id in item_ids:
+            try:
+                highest = max(highest, int(item_id))
+            except ValueError:
+                continue
+        if highest >= self.next_id:
+            self.next_id = highest + 1
+            self.conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('next_id', ?)",
+                (self.next_id,),
+            )
+
+    def allocate_id(self):
+        new_id = str(self.next_id)
+        self.reserve_ids((new_id,))
+        return new_id
+
+    @staticmethod
+    def params(item):
+        return tuple(item[column] for column in COLUMNS) + (search_key((item["name"], item["category"])),)
+
+    def add(self, item):
+        self.conn.execute(
+            f"INSERT INTO items ({SELECT_COLUMNS}, search_key) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            self.params(item),
+        )
+        self.reserve_ids((item["id"],))
+
+    def add_batch(self, items):
+        ids = [item["id"] for item in items]
+        existing = set()
+        for start in range(0, len(ids), ID_CHUNK):
+            chunk = ids[start:start + ID_CHUNK]
+            marks = ", ".join("?" * len(chunk))
+            existing.update(row[0] for row in self.conn.execute(f"SELECT id FROM items WHERE id IN ({marks})", chunk))
+        fresh = [item for item in items if item["id"] not in existing]
+        with self.conn:
+            self.conn.execute("BEGIN")
+            self.conn.executemany(
+                f"INSERT INTO items ({SELECT_COLUMNS}, search_key) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (self.params(item) for item in fresh),
+            )
+        self.reserve_ids(ids)
+        return [item_id for item_id in ids if item_id in existing]
+
+    def replace(self, old_id, item):
+        assignments = ", ".join(f"{column} = ?" for column in COLUMNS)
+        self.conn.execute(
+            f"UPDATE items SET {assignments}, search_key = ? WHERE id = ?",
+            self.params(item) + (old_id,),
+        )
+        self.reserve_ids((item["id"],))
+
+    def remove(self, item_id):
+        self.conn.execute("DELETE FROM items WHERE id = ?", (item_id,))
@@ -0,0 +1,259 @@
+import argparse
+import json
+import os
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from supply_ingest import complete_length, compact, fingerprint, read_header, read_tail
+
+CUBE_VERSION = 2
+CHUNK_SIZE = 200_000
+DIMENSIONS = ("supplier", "category")
+MEASURES = ("revenue", "quantity")
+# Тижні ISO: понеділок–неділя з міткою понеділка, як і місяці з міткою першого дня.
+FREQUENCIES = {"day": None, "week": "W-MON", "month": "MS"}
+
+
+def cube_path_for(csv_path: Path) -> Path:
+    return csv_path.with_name(f".{csv_path.name}.cube.npz")
+
+
+def grown_capacity(needed: int, current: int) -> int:
+    return current if needed <= current else max(needed, 2 * current)
+
+
+class RevenueCube:
+    # Рядок на кожну пару постачальник × категорія, що траплялася в даних, стовпчик на кожен день:
+    # пам'ять — пари × дні × 16 байт (10 тис. пар за три роки ≈ 175 МБ), а не всі можливі пари.
+    # Буфери ростуть удвічі, тож нові пари й дати не перевиділяють куб на кожній частині файлу.
+    # Тижні й місяці згортаються з днів на запит.
+    def __init__(self) -> None:
+        self.suppliers: list[str] = []
+        self.categories: list[str] = []
+        self.pair_keys: list[tuple[int, int]] = []
+        self.pair_index: dict[tuple[int, int], int] = {}
+        self.start: np.datetime64 | None = None
+        self.span = 0
+        self.quantity_buffer = np.zeros((0, 0), dtype=np.int64)
+        self.revenue_buffer = np.zeros((0, 0), dtype=np.float64)
+        self.source: dict = {}
+
+    @property
+    def quantity(self) -> np.ndarray:
+        return self.quantity_buffer[:len(self.pair_keys), :self.span]
+
+    @property
+    def revenue(self) -> np.ndarray:
+        return self.revenue_buffer[:len(self.pair_keys), :self.span]
+
+    @property
+    def days(self) -> pd.DatetimeIndex:
+        return pd.date_range(self.start, periods=self.span, freq="D")
+
+    def codes(self, labels: list[str], values: pd.Series) -> np.ndarray:
+        codes, uniques = pd.factorize(values)
+        positions = {label: index for index, label in enumerate(labels)}
+        for value in map(str, uniques):
+            if value not in positions:
+                positions[value] = len(labels)
+                labels.append(value)
+        mapping = np.array([positions[value] for value in map(str, uniques)], dtype=np.int64)
+        return mapping[codes]
+
+    def pair_codes(self, supplier_codes: np.ndarray, category_codes: np.ndarray) -> np.ndarray:
+        uniques, inverse = np.unique((supplier_codes << 32) | category_codes, return_inverse=True)
+        mapping = np.empty(len(uniques), dtype=np.int64)
+        for position, combined in enumerate(uniques.tolist()):
+            key = (combined >> 32, combined & 0xFFFFFFFF)
+            index = self.pair_index.get(key)
+            if index is None:
+                index = self.pair_index[key] = len(self.pair_keys)
+                self.pair_keys.append(key)
+            mapping[position] = index
+        return mapping[inverse]
+
+    def reserve(self, pairs: int, span: int, shift: int) -> None:
+        rows, columns = self.revenue_buffer.shape
+        if pairs <= rows and span <= columns and not shift:
+            return
+        shape = (grown_capacity(pairs, rows), grown_capacity(span, columns))
+        for name in ("quantity_buffer", "revenue_buffer"):
+            buffer = getattr(self, name)
+            grown = np.zeros(shape, dtype=buffer.dtype)
+            grown[:rows, shift:shift + self.span] = buffer[:, :self.span]
+            setattr(self, name, grown)
+
+    def add(self, chunk: pd.DataFrame) -> None:
+        chunk = chunk.dropna(subset=["supplier", "category", "date", "quantity", "price_per_unit"])
+        if chunk.empty:
+            return
+        days = chunk["date"].to_numpy().astype("datetime64[D]")
+        first, last = days.min(), days.max()
+        if self.start is None:
+            self.start = first
+        shift = max(0, int((self.start - first).astype(int)))
+        self.start = min(self.start, first)
+        span = max(self.span + shift, int((last - self.start).astype(int)) + 1)
+
+        supplier_codes = self.codes(self.suppliers, chunk["supplier"])
+        category_codes = self.codes(self.categories, chunk["category"])
+        pair_codes = self.pair_codes(supplier_codes, category_codes)
+        self.reserve(len(self.pair_keys), span, shift)
+        self.span = span
+
+        quantity = chunk["quantity"].to_numpy(dtype=np.int64)
+        flat = pair_codes * self.revenue_buffer.shape[1] + (days - self.start).astype(np.int64)
+        cells, inverse = np.unique(flat, return_inverse=True)
+        self.quantity_buffer.reshape(-1)[cells] += np.bincount(inverse, weights=quantity).astype(np.int64)
+        self.revenue_buffer.reshape(-1)[cells] += np.bincount(
+            inverse, weights=quantity * chunk["price_per_unit"].to_numpy(dtype=float)
+        )
+
+    def group(self, values: np.ndarray, by: str) -> tuple[np.ndarray, list[str]]:
+        if by not in DIMENSIONS:
+            raise ValueError(f"Невідомий вимір: {by}")
+        column, labels = (0, self.suppliers) if by == "supplier" else (1, self.categories)
+        keys = np.array(self.pair_keys, dtype=np.int64).reshape(-1, 2)[:, column]
+        grouped = np.zeros((len(labels),) + values.shape[1:], dtype=values.dtype)
+        np.add.at(grouped, keys, values)
+        return grouped, labels
+
+    def day_range(self, start=None, end=None) -> slice:
+        first = 0 if start is None else int((np.datetime64(start, "D") - self.start).astype(int))
+        last = self.span if end is None else int((np.datetime64(end, "D") - self.start).astype(int)) + 1
+        return slice(max(first, 0), max(last, 0))
+
+    def query(self, by: str = "supplier", start=None, end=None, measure: str = "revenue") -> pd.Series:
+        if self.start is None:
+            return pd.Series(dtype=float)
+        values = getattr(self, measure)[:, self.day_range(start, end)]
+        totals, labels = self.group(values.sum(axis=1), by)
+        return pd.Series(totals, index=labels, name=measure)
+
+    def top(self, by: str = "category", last_days: int = 7, n: int = 5, measure: str = "revenue") -> pd.Series:
+        if self.start is None:
+            return pd.Series(dtype=float)
+        end = self.start + np.timedelta64(self.span - 1, "D")
+        start = end - np.timedelta64(last_days - 1, "D")
+        return self.query(by, start, end, measure).nlargest(n)
+
+    def rollup(self, by: str = "supplier", freq: str = "month", start=None, end=None, measure: str = "revenue") -> pd.DataFrame:
+        if self.start is None:
+            return pd.DataFrame()
+        days = self.day_range(start, end)
+        values, labels = self.group(getattr(self, measure)[:, days], by)
+        daily = pd.DataFrame(values.T, index=self.days[days], columns=labels)
+        if FREQUENCIES[freq] is None:
+            return daily
+        return daily.resample(FREQUENCIES[freq], label="left", closed="left").sum()
+
+    def save(self, path: Path) -> None:
+        meta = {
+            "version": CUBE_VERSION,
+            "suppliers": self.suppliers,
+            "categories": self.categories,
+            "start": None if self.start is None else str(self.start),
+            "source": self.source,
+        }
+        temp_path = path.with_name(path.name + ".tmp")
+        with open(temp_path, "wb") as f:
+            np.savez(
+                f,
+                quantity=self.quantity,
+                revenue=self.revenue,
+                pairs=np.array(self.pair_keys, dtype=np.int64).reshape(-1, 2),
+                meta=np.array(json.dumps(meta, ensure_ascii=False)),
+            )
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path: Path) -> "RevenueCube | None":
+        try:
+            with np.load(path) as data:
+                meta = json.loads(str(data["meta"]))
+                if meta.get("version") != CUBE_VERSION:
+                    return None
+                cube = cls()
+                cube.quantity_buffer = data["quantity"]
+                cube.revenue_buffer = data["revenue"]
+                pairs = data["pairs"]
+        except (OSError, ValueError, KeyError):
+            return None
+        cube.suppliers = meta["suppliers"]
+        cube.categories = meta["categories"]
+        cube.pair_keys = [tuple(pair) for pair in pairs.tolist()]
+        cube.pair_index = {pair: index for index, pair in enumerate(cube.pair_keys)}
+        cube.span = cube.revenue_buffer.shape[1]
+        cube.start = None if meta["start"] is None else np.datetime64(meta["start"], "D")
+        cube.source = meta["source"]
+        return cube
+
+
+def build_cube(csv_path: Path, cube_path: Path | None = None) -> RevenueCube:
+    # Як і --incremental в analisys.py: дочитуються лише рядки після збереженого зсуву.
+    cube_path = cube_path or cube_path_for(csv_path)
+    cube = RevenueCube.load(cube_path)
+    with open(csv_path, "rb") as f:
+        end = complete_length(f)
+        stat = os.fstat(f.fileno())
+        source = cube.source if cube is not None else {}
+        if (
+            cube is None
+            or source.get("identity") != [stat.st_dev, stat.st_ino]
+            or source.get("offset", 0) > end
+            or source.get("fingerprint") != fingerprint(f, source.get("offset", 0))
+        ):
+            cube = RevenueCube()
+            columns, offset = read_header(f)
+            changed = True
+        else:
+            columns, offset = source["columns"], source["offset"]
+            changed = end > offset
+        if end > offset:
+            with read_tail(f, offset, end, columns, CHUNK_SIZE) as reader:
+                for chunk in reader:
+                    cube.add(compact(chunk))
+        cube.source = {
+            "identity": [stat.st_dev, stat.st_ino],
+            "offset": end,
+            "fingerprint": fingerprint(f, end),
+            "columns": columns,
+        }
+    if changed:
+        cube.save(cube_path)
+    return cube
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Куб виручки постачальник × категорія × день для supplies.csv.")
+    parser.add_argument("csv", nargs="?", default="supplies.csv", help="CSV-файл поставок (default: supplies.csv)")
+    parser.add_argument("--by", choices=DIMENSIONS, default="supplier", help="Вимір групування (default: supplier)")
+    parser.add_argument("--measure", choices=MEASURES, default="revenue", help="Показник (default: revenue)")
+    parser.add_argument("--from", dest="start", default=None, help="Перший день періоду, YYYY-MM-DD")
+    parser.add_argument("--to", dest="end", default=None, help="Останній день періоду, YYYY-MM-DD")
+    parser.add_argument("--last", type=int, default=None, help="Останні N днів наявних даних")
+    parser.add_argument("--top", type=int, default=None, help="Показати лише N найбільших")
+    parser.add_argument("--rollup", choices=tuple(FREQUENCIES), default=None, help="Розбити період по днях/тижнях/місяцях")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    cube = build_cube(Path(args.csv))
+    built = time.perf_counter()
+    if args.rollup:
+        result = cube.rollup(args.by, args.rollup, args.start, args.end, args.measure)
+    elif args.last:
+        result = cube.top(args.by, args.last, args.top or len(cube.suppliers) + len(cube.categories), args.measure)
+    else:
+        result = cube.query(args.by, args.start, args.end, args.measure).sort_values(ascending=False)
+        if args.top:
+            result = result.head(args.top)
+    answered = time.perf_counter()
+    print(result.to_string())
+    print(f"Куб: {built - started:.3f} с, запит: {(answered - built) * 1000:.2f} мс")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+import hashlib
+import io
+import json
+import os
+import shutil
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+CATEGORY_COLUMNS = ("supplier", "category")
+DATE_COLUMNS = ("date",)
+DATE_FORMAT = "%Y-%m-%d"
+SUPPLY_DTYPES = {column: "category" for column in CATEGORY_COLUMNS} | {"price_per_unit": "float64"}
+CACHE_VERSION = 1
+META_FILE = "meta.json"
+FINGERPRINT_BYTES = 4096
+
+
+def file_identity(path: Path) -> list:
+    stat = os.stat(path)
+    return [str(Path(path).resolve()), stat.st_size, stat.st_mtime_ns]
+
+
+def cache_dir_for(csv_path: Path) -> Path:
+    return csv_path.with_name(f".{csv_path.name}.cache")
+
+
+def compact(df: pd.DataFrame) -> pd.DataFrame:
+    for column in DATE_COLUMNS:
+        if column in df:
+            df[column] = pd.to_datetime(df[column], format=DATE_FORMAT, errors="coerce")
+    for column in df.columns:
+        if pd.api.types.is_integer_dtype(df[column]):
+            df[column] = pd.to_numeric(df[column], downcast="integer")
+        elif not isinstance(df[column].dtype, pd.CategoricalDtype) and pd.api.types.is_string_dtype(df[column]):
+            df[column] = df[column].astype("category")
+    return df
+
+
+def read_typed(csv_path: Path, **kwargs):
+    return pd.read_csv(csv_path, dtype=SUPPLY_DTYPES, **kwargs)
+
+
+def read_cache(cache_dir: Path, identity: list) -> pd.DataFrame | None:
+    try:
+        meta = json.loads((cache_dir / META_FILE).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    if meta.get("version") != CACHE_VERSION or meta.get("identity") != identity:
+        return None
+    columns = {}
+    for index, spec in enumerate(meta["columns"]):
+        values = np.load(cache_dir / f"{index}.npy", mmap_mode="r")
+        if spec["kind"] == "category":
+            columns[spec["name"]] = pd.Categorical.from_codes(values, categories=spec["categories"])
+        else:
+            columns[spec["name"]] = values
+    return pd.DataFrame(columns, copy=False)
+
+
+def write_cache(cache_dir: Path, identity: list, df: pd.DataFrame) -> None:
+    # meta.json пишеться останнім: поки він відсутній або не збігається з файлом, кеш ігнорується.
+    shutil.rmtree(cache_dir, ignore_errors=True)
+    cache_dir.mkdir()
+    columns = []
+    for index, name in enumerate(df.columns):
+        series = df[name]
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            np.save(cache_dir / f"{index}.npy", series.cat.codes.to_numpy())
+            columns.append({"name": name, "kind": "category", "categories": series.cat.categories.tolist()})
+        else:
+            np.save(cache_dir / f"{index}.npy", series.to_numpy())
+            columns.append({"name": name, "kind": "array"})
+    meta = {"version": CACHE_VERSION, "identity": identity, "columns": columns}
+    temp_path = cache_dir / f"{META_FILE}.tmp"
+    temp_path.write_text(json.dumps(meta, ensure_ascii=False), encoding="utf-8")
+    os.replace(temp_path, cache_dir / META_FILE)
+
+
+def load_supplies(csv_path: Path, use_cache: bool = True) -> pd.DataFrame:
+    if not use_cache:
+        return compact(read_typed(csv_path))
+    identity = file_identity(csv_path)
+    cache_dir = cache_dir_for(csv_path)
+    df = read_cache(cache_dir, identity)
+    if df is None:
+        df = compact(read_typed(csv_path))
+        try:
+            write_cache(cache_dir, identity, df)
+        except OSError:
+            pass
+    return df
+
+
+class BoundedReader(io.RawIOBase):
+    def __init__(self, raw, limit: int) -> None:
+        self.raw = raw
+        self.remaining = limit
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        size = min(len(buffer), self.remaining)
+        if size <= 0:
+            return 0
+        read = self.raw.readinto(memoryview(buffer)[:size])
+        self.remaining -= read
+        return read
+
+
+def complete_length(f) -> int:
+    # Незавершений останній рядок (файл саме дописується) лишається на наступний запуск.
+    end = f.seek(0, os.SEEK_END)
+    position = end
+    while position > 0:
+        start = max(0, position - 65536)
+        f.seek(start)
+        block = f.read(position - start)
+        newline = block.rfind(b"\n")
+        if newline >= 0:
+            return start + newline + 1
+        position = start
+    return 0
+
+
+def fingerprint(f, offset: int) -> str:
+    start = max(0, offset - FINGERPRINT_BYTES)
+    f.seek(start)
+    return hashlib.sha1(f.read(offset - start)).hexdigest()
+
+
+def read_header(f) -> tuple[list[str], int]:
+    f.seek(0)
+    header = f.readline().decode("utf-8")
+    return list(pd.read_csv(io.StringIO(header), nrows=0).columns), f.tell()
+
+
+def read_tail(f, offset: int, end: int, columns: list[str], chunk_size: int):
+    f.seek(offset)
+    tail = io.BufferedReader(BoundedReader(f, end - offset))
+    return read_typed(tail, header=None, names=columns, chunksize=chunk_size)
@@ -0,0 +1,185 @@
+import heapq
+import math
+from collections import defaultdict
+from hashlib import blake2b
+
+MAX_SKETCH_DEPTH = 16
+
+
+def pop_min(heap: list, counts: dict) -> tuple[int, str]:
+    # Купа лінива: значення в ній можуть відставати від counts, тож актуальний мінімум шукаємо тут.
+    while True:
+        count, key = heap[0]
+        current = counts.get(key)
+        if current is None:
+            heapq.heappop(heap)
+        elif current == count:
+            heapq.heappop(heap)
+            return count, key
+        else:
+            heapq.heapreplace(heap, (current, key))
+
+
+def check_weight(weight: int) -> None:
+    if weight < 0:
+        raise ValueError("Наближені лічильники підтримують лише невід'ємні ваги")
+
+
+class ExactTopN:
+    def __init__(self) -> None:
+        self.totals = defaultdict(int)
+
+    def update(self, key: str, weight: int = 1) -> None:
+        self.totals[key] += weight
+
+    def merge(self, other: "ExactTopN") -> None:
+        for key, value in other.totals.items():
+            self.totals[key] += value
+
+    def top(self, n: int) -> list[tuple[str, int]]:
+        totals = self.totals
+        return [(key, totals[key]) for key in heapq.nlargest(n, totals, key=totals.__getitem__)]
+
+    def items(self) -> dict:
+        return dict(self.totals)
+
+    def error_bound(self) -> int:
+        return 0
+
+
+class SpaceSaving:
+    # Space-Saving: не більше capacity лічильників; кожна оцінка завищена щонайбільше на total / capacity,
+    # і кожен ключ із часткою понад 1 / capacity гарантовано присутній у результаті.
+    def __init__(self, capacity: int = 1000) -> None:
+        if capacity < 1:
+            raise ValueError("Місткість має бути додатною")
+        self.capacity = capacity
+        self.counts: dict[str, int] = {}
+        self.errors: dict[str, int] = {}
+        self.heap: list[tuple[int, str]] = []
+        self.total = 0
+
+    def update(self, key: str, weight: int = 1) -> None:
+        check_weight(weight)
+        self.total += weight
+        counts = self.counts
+        if key in counts:
+            counts[key] += weight
+            return
+        floor = 0
+        if len(counts) >= self.capacity:
+            floor, victim = pop_min(self.heap, counts)
+            del counts[victim]
+            del self.errors[victim]
+        counts[key] = floor + weight
+        self.errors[key] = floor
+        heapq.heappush(self.heap, (floor + weight, key))
+
+    def floor(self) -> int:
+        return min(self.counts.values()) if len(self.counts) >= self.capacity else 0
+
+    def merge(self, other: "SpaceSaving") -> None:
+        own_floor, other_floor = self.floor(), other.floor()
+        counts = {}
+        errors = {}
+        for key in self.counts.keys() | other.counts.keys():
+            counts[key] = self.counts.get(key, own_floor) + other.counts.get(key, other_floor)
+            errors[key] = self.errors.get(key, own_floor) + other.errors.get(key, other_floor)
+        kept = heapq.nlargest(self.capacity, counts, key=counts.__getitem__)
+        self.counts = {key: counts[key] for key in kept}
+        self.errors = {key: errors[key] for key in kept}
+        self.heap = [(count, key) for key, count in self.counts.items()]
+        heapq.heapify(self.heap)
+        self.total += other.total
+
+    def top(self, n: int) -> list[tuple[str, int]]:
+        counts = self.counts
+        return [(key, counts[key]) for key in heapq.nlargest(n, counts, key=counts.__getitem__)]
+
+    def items(self) -> dict:
+        return dict(self.counts)
+
+    def error_bound(self) -> float:
+        return self.total / self.capacity
+
+
+class CountMinTopN:
+    # Count-Min: з імовірністю 1 - delta кожна оцінка завищена не більше ніж на epsilon * total;
+    # кандидатів у топ зберігається не більше capacity.
+    def __init__(self, epsilon: float = 0.001, delta: float = 0.01, capacity: int = 100) -> None:
+        if not 0 < epsilon < 1 or not 0 < delta < 1:
+            raise ValueError("epsilon і delta мають бути в межах (0, 1)")
+        self.epsilon = epsilon
+        self.delta = delta
+        self.capacity = capacity
+        self.width = math.ceil(math.e / epsilon)
+        self.depth = min(MAX_SKETCH_DEPTH, math.ceil(math.log(1 / delta)))
+        self.table = [[0] * self.width for _ in range(self.depth)]
+        self.candidates: dict[str, int] = {}
+        self.heap: list[tuple[int, str]] = []
+        self.total = 0
+
+    def indexes(self, key: str) -> list[int]:
+        digest = blake2b(key.encode("utf-8"), digest_size=4 * self.depth).digest()
+        return [int.from_bytes(digest[4 * row:4 * row + 4], "little") % self.width for row in range(self.depth)]
+
+    def estimate(self, key: str) -> int:
+        return min(row[index] for row, index in zip(self.table, self.indexes(key)))
+
+    def update(self, key: str, weight: int = 1) -> None:
+        check_weight(weight)
+        self.total += weight
+        estimate = None
+        for row, index in zip(self.table, self.indexes(key)):
+            row[index] += weight
+            estimate = row[index] if estimate is None else min(estimate, row[index])
+        self.offer(key, estimate)
+
+    def offer(self, key: str, estimate: int) -> None:
+        candidates = self.candidates
+        if key in candidates:
+            candidates[key] = estimate
+            return
+        if len(candidates) >= self.capacity:
+            floor, victim = pop_min(self.heap, candidates)
+            if estimate <= floor:
+                heapq.heappush(self.heap, (floor, victim))
+                return
+            del candidates[victim]
+        candidates[key] = estimate
+        heapq.heappush(self.heap, (estimate, key))
+
+    def merge(self, other: "CountMinTopN") -> None:
+        if (self.width, self.depth) != (other.width, other.depth):
+            raise ValueError("Не можна зливати скетчі різного розміру")
+        for row, other_row in zip(self.table, other.table):
+            for index, value in enumerate(other_row):
+                if value:
+                    row[index] += value
+        self.total += other.total
+        keys = self.candidates.keys() | other.candidates.keys()
+        estimates = {key: self.estimate(key) for key in keys}
+        kept = heapq.nlargest(self.capacity, estimates, key=estimates.__getitem__)
+        self.candidates = {key: estimates[key] for key in kept}
+        self.heap = [(count, key) for key, count in self.candidates.items()]
+        heapq.heapify(self.heap)
+
+    def top(self, n: int) -> list[tuple[str, int]]:
+        candidates = self.candidates
+        return [(key, candidates[key]) for key in heapq.nlargest(n, candidates, key=candidates.__getitem__)]
+
+    def items(self) -> dict:
+        return dict(self.candidates)
+
+    def error_bound(self) -> float:
+        return self.epsilon * self.total
+
+
+TRACKERS = {"exact": ExactTopN, "space-saving": SpaceSaving, "count-min": CountMinTopN}
+
+
+def make_tracker(spec: tuple | None = None):
+    if spec is None:
+        return ExactTopN()
+    method, *params = spec
+    return TRACKERS[method](*params)
@@ -1,4 +1,28 @@
+import argparse
+import itertools
+import mmap
+import os
+import re
 from collections import defaultdict
+from collections.abc import Iterable
+from concurrent.futures import ProcessPoolExecutor
+from typing import NamedTuple
+
+from heavy_hitters import TRACKERS, make_tracker
+
+SHARD_BLOCK_BYTES = 16 * 2**20
+READ_BLOCK_BYTES = 4 * 2**20
+LINES_PER_BLOCK = 20_000
+TRACKED_KEYS = ("action", "user", "date")
+LAYOUT_FIELDS = ("user", "action", "amount")
+DEMO_LOGS = [
+    "2024-01-01|user=alice|action=buy|amount=100",
+    "2024-01-01|user=bob|action=buy|amount=50",
+    "2024-01-02|user=alice|action=refund|amount=20",
+    "2024-01-02|user=carol|action=buy|amount=200",
+    "2024-01-03|user=bob|action=buy|amount=150",
+]
+
 
 def parse_log(line: str) -> dict:
     parts = line.split("|")
@@ -13,6 +37,66 @@ def parse_log(line: str) -> dict:
 
     return data
 
+
+class LogRecord(NamedTuple):
+    date: str
+    user: str
+    action: str
+    amount: int
+
+
+class LogLayout:
+    # Порядок полів вивчається з першого рядка й компілюється в регулярний вираз; рядки, що йому
+    # не відповідають (інший порядок, пропуски, незвичний amount), розбирає parse_log.
+    def __init__(self, keys: tuple[str, ...]) -> None:
+        self.keys = keys
+        text = r"([^|\r\n]*)" + "".join(
+            rf"\|{re.escape(key)}=(-?\d+)" if key == "amount" else rf"\|{re.escape(key)}=([^|\r\n]*)"
+            for key in keys
+        ) + r"\r?"
+        self.order = tuple(keys.index(field) + 1 for field in LAYOUT_FIELDS)
+        self.fallback = len(keys) + 1
+        block = f"^(?:{text}|(.*))$"
+        self.text_pattern = re.compile(block, re.MULTILINE)
+        self.bytes_pattern = re.compile(block.encode(), re.MULTILINE)
+
+    @classmethod
+    def learn(cls, line: str) -> "LogLayout | None":
+        keys = tuple(part.split("=", 1)[0] for part in line.rstrip("\r\n").split("|")[1:])
+        if sorted(keys) != sorted(LAYOUT_FIELDS):
+            return None
+        return cls(keys)
+
+    def records(self, block: str) -> Iterable[LogRecord | None]:
+        # Розбирає цілий текстовий блок одним findall, як update_block; нерозібрані рядки дають None.
+        user_index, action_index, amount_index = self.order
+        for groups in self.text_pattern.findall(block):
+            amount = groups[amount_index]
+            if amount:
+                yield LogRecord(groups[0], groups[user_index], groups[action_index], int(amount))
+            elif groups[self.fallback].strip():
+                try:
+                    item = parse_log(groups[self.fallback].rstrip())
+                    record = LogRecord(item["date"], item["user"], item["action"], item["amount"])
+                except (KeyError, ValueError):
+                    record = None
+                yield record
+
+
+def first_line(block: str | bytes) -> str | bytes:
+    # Перший непорожній рядок блоку без розбиття всього блоку на рядки.
+    newline = b"\n" if isinstance(block, bytes) else "\n"
+    start = 0
+    while start < len(block):
+        end = block.find(newline, start)
+        if end < 0:
+            end = len(block)
+        if block[start:end].strip():
+            return block[start:end]
+        start = end + 1
+    return block[:0]
+
+
 def calc_total_amount(logs: list[str]) -> int:
     total = 0
     for line in logs:
@@ -46,23 +130,192 @@ def calc_date_with_max_turnover(logs: list[str]) -> str:
     return max(by_date.keys(), key=lambda d: by_date[d])
 
 
-def build_result(logs: list[str]) -> dict:
-    result = {}
-    result["total_amount"] = calc_total_amount(logs)
-    result["action_counts"] = calc_action_counts(logs)
-    result["top_users"] = calc_top2_users_by_amount(logs)
-    result["top_date"] = calc_date_with_max_turnover(logs)
-    return result
+class LogAggregator:
+    def __init__(self, approximate: dict[str, tuple] | None = None) -> None:
+        self.approximate = approximate or {}
+        unknown = self.approximate.keys() - set(TRACKED_KEYS)
+        if unknown:
+            raise ValueError(f"Невідомі ключі: {', '.join(sorted(unknown))}")
+        self.total_amount = 0
+        self.trackers = {key: make_tracker(self.approximate.get(key)) for key in TRACKED_KEYS}
+        self.layout: LogLayout | None = None
+
+    def update(self, logs: Iterable[str]) -> "LogAggregator":
+        logs = iter(logs)
+        while batch := list(itertools.islice(logs, LINES_PER_BLOCK)):
+            self.update_block("\n".join(batch))
+        return self
+
+    def update_bytes(self, block: bytes) -> "LogAggregator":
+        return self.update_block(block)
+
+    def update_block(self, block: str | bytes) -> "LogAggregator":
+        # Блок — цілі рядки (str або bytes). Проміжні суми ведуться по ключах блоку в його типі,
+        # а в трекери потрапляють один раз на блок, тож bytes декодуються лише для унікальних ключів.
+        binary = isinstance(block, bytes)
+        if self.layout is None:
+            first = first_line(block)
+            self.layout = LogLayout.learn(first.decode("utf-8") if binary else first) or LogLayout(LAYOUT_FIELDS)
+        layout = self.layout
+        user_index, action_index, amount_index = layout.order
+        fallback_index = layout.fallback
+        action_counts = defaultdict(int)
+        user_totals = defaultdict(int)
+        date_totals = defaultdict(int)
+        total = 0
+        pattern = layout.bytes_pattern if binary else layout.text_pattern
+        for groups in pattern.findall(block):
+            amount = groups[amount_index]
+            if amount:
+                date, user, action, amount = groups[0], groups[user_index], groups[action_index], int(amount)
+            elif groups[fallback_index].strip():
+                line = groups[fallback_index].rstrip()
+                item = parse_log(line.decode("utf-8") if binary else line)
+                date, user, action = (
+                    item[key].encode("utf-8") if binary else item[key] for key in ("date", "user", "action")
+                )
+                amount = item["amount"]
+            else:
+                continue
+            total += amount
+            action_counts[action] += 1
+            user_totals[user] += amount
+            date_totals[date] += amount
+
+        self.total_amount += total
+        for key, totals in (("action", action_counts), ("user", user_totals), ("date", date_totals)):
+            update = self.trackers[key].update
+            for value, amount in totals.items():
+                update(value.decode("utf-8") if binary else value, amount)
+        return self
+
+    def update_file(self, f) -> "LogAggregator":
+        tail = b""
+        while block := f.read(READ_BLOCK_BYTES):
+            block = tail + block
+            cut = block.rfind(b"\n") + 1
+            tail = block[cut:]
+            if cut:
+                self.update_bytes(block[:cut])
+        if tail:
+            self.update_bytes(tail)
+        return self
+
+    def merge(self, other: "LogAggregator") -> "LogAggregator":
+        self.total_amount += other.total_amount
+        for key, tracker in self.trackers.items():
+            tracker.merge(other.trackers[key])
+        return self
+
+    def top(self, key: str, n: int) -> list[tuple[str, int]]:
+        return self.trackers[key].top(n)
+
+    def error_bounds(self) -> dict:
+        return {key: self.trackers[key].error_bound() for key in self.approximate}
+
+    def result(self) -> dict:
+        top_date = self.top("date", 1)
+        if not top_date:
+            raise ValueError("Журнал порожній")
+        result = {}
+        result["total_amount"] = self.total_amount
+        result["action_counts"] = self.trackers["action"].items()
+        result["top_users"] = [user for user, _ in self.top("user", 2)]
+        result["top_date"] = top_date[0][0]
+        return result
+
+
+def build_result(logs: Iterable[str], approximate: dict[str, tuple] | None = None) -> dict:
+    return LogAggregator(approximate).update(logs).result()
+
+
+def line_end(mm: mmap.mmap, position: int) -> int:
+    newline = mm.find(b"\n", position)
+    return len(mm) if newline < 0 else newline + 1
+
+
+def shard_ranges(path: str, shards: int) -> list[tuple[int, int]]:
+    size = os.path.getsize(path)
+    if not size:
+        return []
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        bounds = [0]
+        for index in range(1, shards):
+            bounds.append(max(bounds[-1], line_end(mm, size * index // shards)))
+        bounds.append(size)
+    return [(start, end) for start, end in zip(bounds, bounds[1:]) if start < end]
+
+
+def aggregate_range(task: tuple) -> LogAggregator:
+    path, start, end, approximate = task
+    aggregator = LogAggregator(approximate)
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        position = start
+        while position < end:
+            block_end = min(end, line_end(mm, min(end, position + SHARD_BLOCK_BYTES) - 1))
+            aggregator.update_bytes(mm[position:block_end])
+            position = block_end
+    return aggregator
+
+
+def aggregate_parallel(path: str, workers: int | None = None, approximate: dict[str, tuple] | None = None) -> LogAggregator:
+    workers = workers or os.cpu_count() or 1
+    tasks = [(path, start, end, approximate) for start, end in shard_ranges(path, workers * 4)]
+    total = LogAggregator(approximate)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for partial in pool.map(aggregate_range, tasks):
+            total.merge(partial)
+    return total
+
+
+def build_result_parallel(path: str, workers: int | None = None, approximate: dict[str, tuple] | None = None) -> dict:
+    return aggregate_parallel(path, workers, approximate).result()
+
+
+def parse_approximate(text: str) -> tuple[str, tuple]:
+    key, _, spec = text.partition("=")
+    method, *params = spec.split(":")
+    if key not in TRACKED_KEYS or method not in TRACKERS:
+        raise argparse.ArgumentTypeError(f"Очікується ключ=метод[:параметри], напр. user=space-saving:10000: {text}")
+    try:
+        values = tuple(int(param) if param.isdigit() else float(param) for param in params)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Некоректні параметри: {text}") from None
+    return key, (method,) + values
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Агрегація журналу операцій date|user=..|action=..|amount=..")
+    parser.add_argument("path", nargs="?", help="Файл журналу (без нього — демонстраційні дані)")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Кількість процесів; 0 — усі ядра, 1 — послідовне читання (default: 1)",
+    )
+    parser.add_argument(
+        "--approx",
+        type=parse_approximate,
+        action="append",
+        default=[],
+        metavar="KEY=METHOD[:PARAMS]",
+        help="Наближений облік ключа user/action/date з фіксованою пам'яттю: "
+        "space-saving[:місткість] або count-min[:epsilon:delta:кандидатів]",
+    )
+    args = parser.parse_args()
+    approximate = dict(args.approx) or None
+
+    if args.path is None:
+        aggregator = LogAggregator(approximate).update(DEMO_LOGS)
+    elif args.workers == 1:
+        with open(args.path, "rb") as f:
+            aggregator = LogAggregator(approximate).update_file(f)
+    else:
+        aggregator = aggregate_parallel(args.path, args.workers or None, approximate)
+    print(aggregator.result())
+    if approximate:
+        print("Максимальне завищення оцінок:", aggregator.error_bounds())
 
 
 if __name__ == "__main__":
-    logs = [
-        "2024-01-01|user=alice|action=buy|amount=100",
-        "2024-01-01|user=bob|action=buy|amount=50",
-        "2024-01-02|user=alice|action=refund|amount=20",
-        "2024-01-02|user=carol|action=buy|amount=200",
-        "2024-01-03|user=bob|action=buy|amount=150",
-    ]
-
-    result = build_result(logs)
-    print(result)
+    main()
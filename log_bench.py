@@ -0,0 +1,79 @@
+import argparse
+import io
+import random
+import time
+
+from list_processing import (
+    LogAggregator,
+    LogLayout,
+    calc_action_counts,
+    calc_date_with_max_turnover,
+    calc_top2_users_by_amount,
+    calc_total_amount,
+    parse_log,
+)
+
+ACTIONS = ("buy", "refund", "view", "cart")
+
+
+def generate_logs(size: int, seed: int = 42) -> list[str]:
+    rng = random.Random(seed)
+    return [
+        f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}|user=user{rng.randint(1, 50_000)}"
+        f"|action={rng.choice(ACTIONS)}|amount={rng.randint(1, 5000)}"
+        for _ in range(size)
+    ]
+
+
+def four_pass(logs: list[str]) -> dict:
+    return {
+        "total_amount": calc_total_amount(logs),
+        "action_counts": calc_action_counts(logs),
+        "top_users": calc_top2_users_by_amount(logs),
+        "top_date": calc_date_with_max_turnover(logs),
+    }
+
+
+def measure(operation, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        operation()
+        samples.append(time.perf_counter() - started)
+    return sorted(samples)[len(samples) // 2]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Мікробенчмарк розбору журналу date|user=..|action=..|amount=..")
+    parser.add_argument("--lines", type=int, default=200_000, help="Кількість рядків (default: 200000)")
+    parser.add_argument("--repeat", type=int, default=5, help="Кількість вимірювань (default: 5)")
+    args = parser.parse_args()
+
+    logs = generate_logs(args.lines)
+    text = "\n".join(logs) + "\n"
+    data = text.encode("utf-8")
+    layout = LogLayout.learn(logs[0])
+    expected = four_pass(logs)
+    assert LogAggregator().update(logs).result() == expected
+    assert LogAggregator().update_file(io.BytesIO(data)).result() == expected
+
+    cases = [
+        ("parse_log", lambda: [parse_log(line) for line in logs]),
+        ("LogLayout.records", lambda: list(layout.records(text))),
+        ("build_result, 4 проходи", lambda: four_pass(logs)),
+        ("LogAggregator.update", lambda: LogAggregator().update(logs)),
+        ("LogAggregator.update_file", lambda: LogAggregator().update_file(io.BytesIO(data))),
+    ]
+    baseline = None
+    print(f"{'операція':<28} {'p50 с':>8} {'нс/рядок':>10} {'рядків/с':>12} {'x':>6}")
+    for name, operation in cases:
+        elapsed = measure(operation, args.repeat)
+        baseline = baseline or elapsed
+        print(
+            f"{name:<28} {elapsed:8.3f} {elapsed / args.lines * 1e9:10.0f} "
+            f"{args.lines / elapsed:12.0f} {baseline / elapsed:6.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
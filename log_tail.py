@@ -0,0 +1,196 @@
+import argparse
+import asyncio
+import heapq
+import os
+import time
+from collections import defaultdict, deque
+from collections.abc import AsyncIterable, Callable, Iterable
+
+from list_processing import LAYOUT_FIELDS, LINES_PER_BLOCK, READ_BLOCK_BYTES, LogLayout, LogRecord, first_line
+
+
+class SlidingWindow:
+    # Агрегати оновлюються інкрементально при додаванні й витісненні рядків, а знімок
+    # перебудовується один раз на пакет (refresh), тож snapshot() лише повертає готовий словник.
+    def __init__(self, max_lines: int | None = None, max_age: float | None = None, clock: Callable = time.monotonic) -> None:
+        if max_lines is None and max_age is None:
+            raise ValueError("Потрібно задати розмір вікна в рядках або в секундах")
+        self.max_lines = max_lines
+        self.max_age = max_age
+        self.clock = clock
+        self.layout: LogLayout | None = None
+        self.records: deque[tuple[float, LogRecord]] = deque()
+        self.total_amount = 0
+        self.skipped = 0
+        self.action_counts = defaultdict(int)
+        self.user_totals = defaultdict(int)
+        self.user_lines = defaultdict(int)
+        self.date_totals = defaultdict(int)
+        self.date_lines = defaultdict(int)
+        self.current = self.build_snapshot()
+
+    def extend(self, lines: Iterable[str]) -> None:
+        self.extend_block("\n".join(line.rstrip("\r\n") for line in lines))
+
+    def extend_block(self, block: str) -> None:
+        now = self.clock()
+        if self.layout is None and (first := first_line(block)):
+            self.layout = LogLayout.learn(first) or LogLayout(LAYOUT_FIELDS)
+        if self.layout is not None:
+            for record in self.layout.records(block):
+                if record is None:
+                    self.skipped += 1
+                else:
+                    self.add(record, now)
+        self.expire(now)
+
+    def add(self, record: LogRecord, now: float) -> None:
+        self.records.append((now, record))
+        self.total_amount += record.amount
+        self.action_counts[record.action] += 1
+        self.user_totals[record.user] += record.amount
+        self.user_lines[record.user] += 1
+        self.date_totals[record.date] += record.amount
+        self.date_lines[record.date] += 1
+
+    def remove(self, record: LogRecord) -> None:
+        self.total_amount -= record.amount
+        self.action_counts[record.action] -= 1
+        if not self.action_counts[record.action]:
+            del self.action_counts[record.action]
+        for totals, lines, key in (
+            (self.user_totals, self.user_lines, record.user),
+            (self.date_totals, self.date_lines, record.date),
+        ):
+            totals[key] -= record.amount
+            lines[key] -= 1
+            if not lines[key]:
+                del totals[key]
+                del lines[key]
+
+    def expire(self, now: float | None = None) -> None:
+        records = self.records
+        if self.max_lines is not None:
+            while len(records) > self.max_lines:
+                self.remove(records.popleft()[1])
+        if self.max_age is not None:
+            oldest = (self.clock() if now is None else now) - self.max_age
+            while records and records[0][0] < oldest:
+                self.remove(records.popleft()[1])
+
+    def build_snapshot(self) -> dict:
+        user_totals = self.user_totals
+        date_totals = self.date_totals
+        top_date = heapq.nlargest(1, date_totals, key=date_totals.__getitem__)
+        return {
+            "total_amount": self.total_amount,
+            "action_counts": dict(self.action_counts),
+            "top_users": heapq.nlargest(2, user_totals, key=user_totals.__getitem__),
+            "top_date": top_date[0] if top_date else None,
+            "lines": len(self.records),
+            "skipped": self.skipped,
+        }
+
+    def refresh(self) -> dict:
+        self.current = self.build_snapshot()
+        return self.current
+
+    def snapshot(self) -> dict:
+        return self.current
+
+
+async def follow(
+    path: str,
+    window: SlidingWindow,
+    poll_interval: float = 1.0,
+    from_start: bool = False,
+    on_update: Callable[[dict], None] | None = None,
+) -> None:
+    f = open(path, "rb")
+    try:
+        # Кінець файлу може припасти на середину рядка, який саме дописується: його початок
+        # не прочитано, тож усе до першого \n відкидаємо, щоб не порахувати уривок як запис.
+        discard = False
+        if not from_start:
+            end = f.seek(0, os.SEEK_END)
+            if end:
+                f.seek(end - 1)
+                discard = f.read(1) != b"\n"
+        pending = b""
+        while True:
+            block = await asyncio.to_thread(f.read, READ_BLOCK_BYTES)
+            if block:
+                data = block
+                if discard:
+                    newline = data.find(b"\n")
+                    discard = newline < 0
+                    data = b"" if discard else data[newline + 1:]
+                data = pending + data
+                cut = data.rfind(b"\n") + 1
+                pending = data[cut:]
+                if cut:
+                    window.extend_block(data[:cut].decode("utf-8", errors="replace"))
+                if len(block) == READ_BLOCK_BYTES:
+                    continue
+            else:
+                # Файл обрізали або підмінили (ротація журналу): читаємо новий файл з початку.
+                stat = os.stat(path)
+                if stat.st_ino != os.fstat(f.fileno()).st_ino or stat.st_size < f.tell():
+                    f.close()
+                    f = open(path, "rb")
+                    pending = b""
+                    discard = False
+                    continue
+            window.expire()
+            snapshot = window.refresh()
+            if on_update is not None:
+                on_update(snapshot)
+            await asyncio.sleep(poll_interval)
+    finally:
+        f.close()
+
+
+async def consume(
+    lines: AsyncIterable[str],
+    window: SlidingWindow,
+    refresh_interval: float = 1.0,
+    on_update: Callable[[dict], None] | None = None,
+) -> dict:
+    # Рядки накопичуються й розбираються пакетом щонайпізніше раз на refresh_interval,
+    # тож час надходження рядка в межах пакета округлюється до моменту розбору.
+    refreshed = time.monotonic()
+    batch = []
+    async for line in lines:
+        batch.append(line)
+        if len(batch) >= LINES_PER_BLOCK or time.monotonic() - refreshed >= refresh_interval:
+            window.extend(batch)
+            batch = []
+        if time.monotonic() - refreshed >= refresh_interval:
+            refreshed = time.monotonic()
+            snapshot = window.refresh()
+            if on_update is not None:
+                on_update(snapshot)
+    window.extend(batch)
+    return window.refresh()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Живі агрегати журналу за ковзним вікном (tail -f).")
+    parser.add_argument("path", help="Файл журналу, що дописується")
+    parser.add_argument("--minutes", type=float, default=None, help="Вікно за часом надходження, хвилин")
+    parser.add_argument("--lines", type=int, default=None, help="Вікно за кількістю останніх рядків")
+    parser.add_argument("--interval", type=float, default=1.0, help="Період опитування файлу, с (default: 1)")
+    parser.add_argument("--from-start", action="store_true", help="Почати з початку файлу, а не з кінця")
+    args = parser.parse_args()
+    if args.minutes is None and args.lines is None:
+        parser.error("потрібно задати --minutes або --lines")
+
+    window = SlidingWindow(args.lines, None if args.minutes is None else args.minutes * 60)
+    try:
+        asyncio.run(follow(args.path, window, args.interval, args.from_start, print))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()